@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Reflection Benchmark - Measures reflection detection on large HTML responses
+
+Compares one str.find() loop per pattern over the decoded body (how
+reflections used to be located) with the single-pass PatternMatcher over
+the raw bytes, then times the full _check_reflection() path for a miss and
+for an executable hit at the end of the page.
+
+Usage: python benchmarks/bench_reflection.py [-n RUNS]
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.timing import report
+from modules.xss.reflected_scanner import ReflectedXSSScanner
+from utils.pattern_matcher import matcher_for
+
+SIZES = [1, 5]  # MB
+PAYLOAD = '"><svg onload=alert(document.domain)>'
+CANARIES = [f"cnx{index:010x}" for index in range(20)]
+
+BLOCK = (
+    '<div class="item" data-id="42"><a href="/item?id=42" title="Item">Item</a>'
+    '<img src="/img/42.png" alt="" onerror="this.hidden=true"></div>\n'
+    '<script>var item = {"id": 42, "name": "it\\"em"}; // render\n'
+    'render(`item-${item.id}`, \'/* not a comment */\');</script>\n'
+    '<!-- item 42 --><textarea name="note"><b>note</b></textarea>\n'
+)
+
+class Response:
+    def __init__(self, content):
+        self.content = content
+        self.text = content.decode('utf-8')
+
+def page(megabytes, tail=''):
+    body = BLOCK * (megabytes * 1024 * 1024 // len(BLOCK))
+    return f"<html><body>{body}{tail}</body></html>".encode('utf-8')
+
+def find_all(content, patterns):
+    offsets = []
+    for pattern in patterns:
+        offset = content.find(pattern)
+        while offset != -1:
+            offsets.append(offset)
+            offset = content.find(pattern, offset + 1)
+    return offsets
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CyberNexus reflection detection')
+    parser.add_argument('-n', '--runs', type=int, default=10, help='Runs per case (default: 10)')
+    args = parser.parse_args()
+
+    scanner = ReflectedXSSScanner()
+    canaries = matcher_for(tuple(CANARIES))
+    payload = matcher_for((PAYLOAD,))
+
+    for size in SIZES:
+        miss = page(size)
+        hit = page(size, f'<p>{PAYLOAD}</p>')
+        print(f"--- {size} MB page ---")
+        report('20 canaries, decode + str.find loops', lambda: find_all(miss.decode('utf-8'), CANARIES), args.runs)
+        report('20 canaries, one pass over bytes', lambda: canaries.found(miss), args.runs)
+        report('payload miss, decode + str.find loop', lambda: find_all(miss.decode('utf-8'), [PAYLOAD]), args.runs)
+        report('payload miss, one pass over bytes', lambda: payload.found(miss), args.runs)
+        report('_check_reflection miss', lambda: scanner._check_reflection(Response(miss), PAYLOAD), args.runs)
+        report('_check_reflection hit at end of page', lambda: scanner._check_reflection(Response(hit), PAYLOAD), args.runs)
+
+if __name__ == '__main__':
+    main()
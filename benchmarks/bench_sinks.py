@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Sink Matching Benchmark - Measures DOM sink detection on large JavaScript bundles
+
+Compares one `sink in js` test per sink name (how the DOM scanner used to
+look for sinks; it only tells which names occur), the same loop extended
+with str.find() to locate every occurrence, and the SinkMatcher, which
+reports every occurrence with its line and column.
+
+Usage: python benchmarks/bench_sinks.py [-n RUNS]
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.timing import report
+from modules.xss.dom_scanner import DOMXSSScanner
+from utils.sink_matcher import SinkMatcher
+
+SIZES = [1, 5]  # MB
+
+# Minified library code with about one sink occurrence per 600 bytes (real
+# bundles have between that and one per few KB); the dangerous flow is
+# only at the end of the bundle
+BLOCK = (
+    '!function(e,t){"use strict";var n=function(e){return e&&e.nodeType===1},r=/[^\\x20\\t\\r\\n\\f]+/g;'
+    'function o(e,t,n){var r,i=0,a=e.length;for(;i<a;i++){r=t.call(e[i],i,e[i]);if(r===!1)break}return e}'
+    'var c={get:function(e){return e[this.expando]||(e[this.expando]={})},set:function(e,t,n){this.get(e)[t]=n}};'
+    'function u(e,t,n,r){var i=0,a=e.length,s=null==n;if("object"===typeof n)for(i in n)u(e,t,i,n[i],!0);'
+    'else if(void 0!==r&&(s=!0,"function"!==typeof r&&(s=!1),t))return t.call(e,r),e;return s?t.call(e):a?t(e[0],n):r}'
+    'function d(e,t){var n=[],r=0;for(;r<e.length;r++)t(e[r],r)&&n.push(e[r]);return n}'
+    'var f=/^(?:\\s*(<[\\w\\W]+>)[^>]*|#([\\w-]+))/,p=function(e,t){return new p.fn.init(e,t)};'
+    'e.fn.extend({text:function(e){return o(this,function(e){return void 0===e?this.textContent:'
+    'this.empty().each(function(){this.textContent=e})})},css:function(e,t){return u(this,function(e,t,n){'
+    'var r,i,a={},s=0;if(Array.isArray(t)){for(r=getComputedStyle(e),i=t.length;s<i;s++)a[t[s]]=r[t[s]];'
+    'return a}return void 0!==n?e.style[t]=n:r&&r[t]},e,t,arguments.length>1)},delay:function(e){var t=this;'
+    'return setTimeout(function(){$(t).trigger("done")},e||0),this}});\n'
+)
+TAIL = 'x.innerHTML=location.hash;$(document).ready(function(){eval(window.name)});\n'
+
+def bundle(megabytes):
+    return BLOCK * (megabytes * 1024 * 1024 // len(BLOCK)) + TAIL
+
+def presence_loop(js, sinks):
+    return [sink for sink in sinks if sink in js]
+
+def occurrence_loop(js, sinks):
+    occurrences = []
+    for sink in sinks:
+        offset = js.find(sink)
+        while offset != -1:
+            occurrences.append((offset, sink))
+            offset = js.find(sink, offset + 1)
+    return occurrences
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CyberNexus DOM sink matching')
+    parser.add_argument('-n', '--runs', type=int, default=10, help='Runs per case (default: 10)')
+    args = parser.parse_args()
+
+    sinks = DOMXSSScanner().dom_sinks
+    matcher = SinkMatcher(sinks)
+
+    for size in SIZES:
+        js = bundle(size)
+        print(f"--- {size} MB bundle, {len(sinks)} sink names ---")
+        report('`sink in js` per name (names only)', lambda: presence_loop(js, sinks), args.runs)
+        report('str.find() loop per name (every occurrence)', lambda: occurrence_loop(js, sinks), args.runs)
+        report('SinkMatcher (every occurrence, line/column)', lambda: list(matcher.finditer(js)), args.runs)
+
+if __name__ == '__main__':
+    main()
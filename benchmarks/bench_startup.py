@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark - Measures CLI start-up time for --help and the list commands
+
+Usage: python benchmarks/bench_startup.py [-n RUNS]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.timing import report
+
+COMMANDS = [
+    ['--help'],
+    ['scan', '--help'],
+    ['profile', 'list']
+]
+
+def run(argv):
+    # A command that fails is not timing start-up but an error path
+    result = subprocess.run(argv, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        sys.exit(f"{' '.join(argv[1:])} exited with status {result.returncode}:\n{result.stderr.strip()}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CyberNexus CLI start-up time')
+    parser.add_argument('-n', '--runs', type=int, default=10, help='Runs per command (default: 10)')
+    args = parser.parse_args()
+
+    report('python -c pass (interpreter only)', lambda: run([sys.executable, '-c', 'pass']), args.runs)
+    for command in COMMANDS:
+        argv = [sys.executable, 'cybernexus.py'] + command
+        report('cybernexus.py ' + ' '.join(command), lambda: run(argv), args.runs)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+"""
+Benchmark Timing - Shared timing and reporting helpers for the benchmarks
+"""
+
+import gc
+import statistics
+import time
+
+def measure(function, runs):
+    """(min, median) wall time of function() over runs calls, in ms.
+
+    Like timeit, with the garbage collector off: otherwise a collection
+    set off by one case's allocations is billed to whichever runs next.
+    """
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(runs):
+            started = time.perf_counter()
+            function()
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        gc.enable()
+    return min(timings), statistics.median(timings)
+
+def report(label, function, runs):
+    best, median = measure(function, runs)
+    print(f"{label:<48} min {best:8.2f} ms   median {median:8.2f} ms")
@@ -8,50 +8,72 @@ import sys
 import os
 import json
 import time
-import rich
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
-from rich.table import Table
-from rich.syntax import Syntax
-from rich.text import Text
-from rich.tree import Tree
-from rich.prompt import Prompt, Confirm
-from colorama import init, Fore, Back, Style
+from colorama import init
 
 # Initialize colorama
 init(autoreset=True)
 
-# Import scanner modules
-from modules.xss.reflected_scanner import ReflectedXSSScanner
-from modules.xss.dom_scanner import DOMXSSScanner
-from modules.xss.stored_scanner import StoredXSSScanner
-from modules.clickjacking_scanner import ClickjackingScanner
-from modules.lfi_scanner import LFIScanner
-from modules.ssrf_scanner import SSRFScanner
-from utils.profile_manager import ProfileManager
-from utils.plugin_updater import PluginUpdater
-from utils.report_generator import ReportGenerator
+# Scanner modules, the rest of rich, requests and bs4 are imported on first
+# use so that --help and the list commands start quickly
+from modules.registry import ScannerRegistry
+from utils import document
 
 # Create console for rich output
 console = Console()
 
+# Console style for each finding severity
+SEVERITY_STYLES = {
+    'high': 'bold red',
+    'medium': 'bold yellow',
+    'low': 'blue',
+    'info': 'dim'
+}
+
 class CyberNexus:
     def __init__(self):
-        self.scanners = {
-            'xss-reflected': ReflectedXSSScanner(),
-            'xss-dom': DOMXSSScanner(),
-            'xss-stored': StoredXSSScanner(),
-            'xss-all': None,  # Special case to run all XSS scanners
-            'clickjacking': ClickjackingScanner(),
-            'lfi': LFIScanner(),
-            'ssrf': SSRFScanner()
-        }
-        self.profile_manager = ProfileManager()
-        self.plugin_updater = PluginUpdater()
-        self.report_generator = ReportGenerator()
+        # Scanners are resolved by name and only imported/built when selected
+        self.scanners = ScannerRegistry(lambda: {'http': self.http})
+        self._http = None
+        self._profile_manager = None
+        self._plugin_updater = None
+        self._report_generator = None
+    
+    @property
+    def http(self):
+        # One pooled keep-alive transport shared by every scanner, paced per
+        # host at the default --delay of 0.5s
+        if self._http is None:
+            from utils.http_client import HTTPClient
+            self._http = HTTPClient(rate=2.0)
+        return self._http
+    
+    @property
+    def profile_manager(self):
+        if self._profile_manager is None:
+            from utils.profile_manager import ProfileManager
+            self._profile_manager = ProfileManager()
+        return self._profile_manager
+    
+    @property
+    def plugin_updater(self):
+        if self._plugin_updater is None:
+            from utils.plugin_updater import PluginUpdater
+            self._plugin_updater = PluginUpdater()
+        return self._plugin_updater
+    
+    @property
+    def report_generator(self):
+        if self._report_generator is None:
+            from utils.report_generator import ReportGenerator
+            self._report_generator = ReportGenerator()
+        return self._report_generator
         
     def display_banner(self):
+        from rich.panel import Panel
+        from rich.text import Text
+        
         banner = r"""
   _____      _               _   _                     
  / ____|    | |             | \ | |                    
@@ -82,6 +104,10 @@ class CyberNexus:
         # Scan command
         scan_parser = subparsers.add_parser('scan', help='Run security scans')
         scan_parser.add_argument('-u', '--url', help='Target URL to scan')
+        scan_parser.add_argument('-L', '--targets', metavar='FILE',
+                                help='File with one target URL per line, or - for stdin')
+        scan_parser.add_argument('-c', '--concurrency', type=int, default=4,
+                                help='Number of targets scanned at once with --targets (default: 4)')
         scan_parser.add_argument('-t', '--type', choices=self.scanners.keys(), 
                                 help='Type of scan to perform')
         scan_parser.add_argument('-a', '--all', action='store_true', 
@@ -89,10 +115,51 @@ class CyberNexus:
         scan_parser.add_argument('-o', '--output', help='Output file for results')
         scan_parser.add_argument('-f', '--format', choices=['json', 'html', 'txt'], default='json',
                                 help='Output format (default: json)')
+        scan_parser.add_argument('-s', '--stream', metavar='FILE',
+                                help='Append each finding to FILE as a JSON line as soon as it is found')
+        scan_parser.add_argument('-j', '--journal', metavar='FILE',
+                                help='Record completed work in FILE (SQLite) so the scan can be resumed')
+        scan_parser.add_argument('--resume', action='store_true',
+                                help='Skip work already recorded in the journal (default journal: cybernexus-journal.db)')
+        scan_parser.add_argument('--stats', metavar='FILE', default='cybernexus-stats.db',
+                                help='Payload hit-rate store used to try likely payloads first (default: cybernexus-stats.db)')
+        scan_parser.add_argument('--no-stats', action='store_true',
+                                help='Keep payloads in corpus order and do not record hit rates')
+        scan_parser.add_argument('--script-cache', metavar='FILE', default='cybernexus-scripts.db',
+                                help='On-disk cache of external scripts and their sink analysis (default: cybernexus-scripts.db)')
+        scan_parser.add_argument('--no-script-cache', action='store_true',
+                                help='Download and analyse external scripts on every run')
+        scan_parser.add_argument('--payloads', metavar='DIR',
+                                help='Extra payload corpus directory (<family>.jsonl files, merged with the built-in ones)')
         scan_parser.add_argument('-v', '--verbose', action='store_true',
                                 help='Enable verbose output')
         scan_parser.add_argument('-d', '--delay', type=float, default=0.5,
-                                help='Delay between requests in seconds (default: 0.5)')
+                                help='Delay between requests to the same host in seconds (default: 0.5)')
+        scan_parser.add_argument('-r', '--rate', type=float, default=None,
+                                help='Requests per second per host, overrides --delay (0 disables rate limiting)')
+        scan_parser.add_argument('--burst', type=int, default=1,
+                                help='Requests allowed back-to-back per host before pacing kicks in (default: 1)')
+        scan_parser.add_argument('--timeout', type=float, default=10,
+                                help='HTTP request timeout in seconds (default: 10)')
+        scan_parser.add_argument('--pool-size', type=int, default=10,
+                                help='Keep-alive connections kept per host (default: 10)')
+        scan_parser.add_argument('--max-body', type=int, default=10 * 1024 * 1024, metavar='BYTES',
+                                help='Read at most BYTES of each response body (default: 10 MiB, 0 for no limit)')
+        scan_parser.add_argument('--cache-size', type=int, default=256,
+                                help='Responses kept in the shared baseline cache, 0 disables it (default: 256)')
+        scan_parser.add_argument('--cache-ttl', type=float, default=300,
+                                help='Seconds a cached response stays valid (default: 300)')
+        scan_parser.add_argument('--coalesce-window', type=float, default=10, metavar='SECONDS',
+                                help='Seconds an identical GET reuses a completed response instead of being sent, '
+                                     '0 to only share responses still in flight (default: 10)')
+        scan_parser.add_argument('--parser', choices=['auto'] + document.PARSERS, default='auto',
+                                help='HTML parser backend; auto prefers lxml when installed (default: auto)')
+        scan_parser.add_argument('-e', '--engine', choices=['threads', 'async'], default='threads',
+                                help='Execution engine: worker threads or a single asyncio event loop (default: threads)')
+        scan_parser.add_argument('-p', '--parallel', action='store_true',
+                                help='Run the selected scanners concurrently (with --all or xss-all)')
+        scan_parser.add_argument('-w', '--workers', type=int, default=None,
+                                help='Number of concurrent scanners with --parallel (default: one per scanner)')
         
         # Profile command
         profile_parser = subparsers.add_parser('profile', help='Manage scan profiles')
@@ -123,16 +190,27 @@ class CyberNexus:
         add_plugin.add_argument('-r', '--repo', required=True, help='GitHub repository URL')
         add_plugin.add_argument('-b', '--branch', default='main', help='Repository branch (default: main)')
         
+        # Report command
+        report_parser = subparsers.add_parser('report', help='Build a report from a streamed findings file')
+        report_parser.add_argument('-i', '--input', required=True, help='JSONL file written by scan --stream')
+        report_parser.add_argument('-o', '--output', required=True, help='Output file for the report')
+        report_parser.add_argument('-f', '--format', choices=['json', 'html', 'txt'], default='html',
+                                  help='Output format (default: html)')
+        
         # Interactive mode
         interactive_parser = subparsers.add_parser('interactive', help='Run in interactive mode')
         
         return parser
     
     def run(self):
-        self.display_banner()
         parser = self.setup_argparse()
         args = parser.parse_args()
         
+        # The banner is for scanning sessions; --help and the management
+        # commands skip it
+        if args.command in (None, 'scan', 'interactive'):
+            self.display_banner()
+        
         if not args.command:
             parser.print_help()
             return
@@ -143,10 +221,84 @@ class CyberNexus:
             self._handle_profile_command(args)
         elif args.command == 'plugin':
             self._handle_plugin_command(args)
+        elif args.command == 'report':
+            self._handle_report_command(args)
         elif args.command == 'interactive':
             self._run_interactive_mode()
     
     def _handle_scan_command(self, args):
+        rate = args.rate if args.rate is not None else (1 / args.delay if args.delay > 0 else 0)
+        self.http.configure(pool_maxsize=args.pool_size, timeout=args.timeout, rate=rate, burst=args.burst,
+                            cache_size=args.cache_size, cache_ttl=args.cache_ttl, max_body=args.max_body,
+                            coalesce_window=args.coalesce_window)
+        
+        try:
+            document.set_parser(args.parser)
+        except ValueError as e:
+            console.print(f"[bold red]Error:[/bold red] {str(e)}")
+            return
+        
+        if args.engine == 'async' and not self.http.async_available():
+            console.print("[bold red]Error:[/bold red] The async engine requires aiohttp (pip install aiohttp)")
+            return
+        
+        if args.payloads:
+            if not os.path.isdir(args.payloads):
+                console.print(f"[bold red]Error:[/bold red] Payload directory not found: {args.payloads}")
+                return
+            from utils.payload_library import get_library
+            get_library().add_directory(args.payloads)
+        
+        sink = None
+        if args.stream:
+            from utils.findings import JSONLSink, set_sink
+            sink = JSONLSink(args.stream)
+            set_sink(sink)
+        
+        journal = None
+        if args.journal or args.resume:
+            from utils.scan_journal import ScanJournal, set_journal
+            journal = ScanJournal(args.journal or 'cybernexus-journal.db', resume=args.resume)
+            set_journal(journal)
+        
+        stats = None
+        if not args.no_stats:
+            from utils.payload_stats import PayloadStats, set_stats
+            stats = PayloadStats(args.stats)
+            set_stats(stats)
+        
+        scripts = None
+        if not args.no_script_cache:
+            from utils.script_cache import ScriptCache, set_script_cache
+            scripts = ScriptCache(args.script_cache)
+            set_script_cache(scripts)
+        
+        try:
+            if args.targets:
+                self._handle_batch_scan(args)
+            else:
+                self._handle_single_scan(args)
+        finally:
+            if sink:
+                set_sink(None)
+                sink.close()
+                console.print(f"[dim]{sink.written} findings streamed to {args.stream}[/dim]")
+            if journal:
+                set_journal(None)
+                journal.close()
+                if args.resume:
+                    console.print(f"[dim]Resumed from {journal.path}: {journal.replayed_scans} scans and "
+                                  f"{journal.replayed_units} probes replayed[/dim]")
+            if stats:
+                set_stats(None)
+                stats.close()
+            if scripts:
+                set_script_cache(None)
+                scripts.close()
+    
+    def _handle_single_scan(self, args):
+        from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
+        
         if not args.url and not (args.command == 'profile' and args.profile_command == 'list'):
             console.print("[bold red]Error:[/bold red] URL is required for scanning")
             return
@@ -162,34 +314,50 @@ class CyberNexus:
             console=console
         ) as progress:
             
-            if args.all:
-                task = progress.add_task("[green]Running all scans...", total=len(self.scanners))
-                for scanner_name, scanner in self.scanners.items():
-                    # Skip the special 'xss-all' case
-                    if scanner_name == 'xss-all':
-                        continue
-                        
-                    progress.update(task, description=f"[green]Running {scanner_name} scan...")
-                    if scanner_name.startswith('xss-') and args.verbose:
-                        console.print(f"\n[bold cyan]Running {scanner_name} scan with verbose output:[/bold cyan]")
+            if args.engine == 'async' and self._selected_scan_types(args):
+                scan_types = self._selected_scan_types(args)
+                task = progress.add_task("[green]Running scans on the async engine...", total=len(scan_types))
+                results = self._run_async(self._run_scanners_async(
+                    scan_types, args.url, args,
+                    on_complete=lambda name: progress.update(task, advance=1, description=f"[green]Finished {name} scan")))
                     
-                    results[scanner_name] = scanner.scan(args.url, verbose=args.verbose, delay=args.delay)
-                    progress.update(task, advance=1)
-                    time.sleep(0.5)  # Small delay for UI
+            elif args.all:
+                scan_types = [k for k in self.scanners if k != 'xss-all']
+                task = progress.add_task("[green]Running all scans...", total=len(scan_types))
+                if args.parallel:
+                    results = self._run_scanners_concurrently(
+                        scan_types, args.url, args,
+                        on_complete=lambda name: progress.update(task, advance=1, description=f"[green]Finished {name} scan"))
+                else:
+                    for scanner_name in scan_types:
+                        scanner = self.scanners[scanner_name]
+                        progress.update(task, description=f"[green]Running {scanner_name} scan...")
+                        if scanner_name.startswith('xss-') and args.verbose:
+                            console.print(f"\n[bold cyan]Running {scanner_name} scan with verbose output:[/bold cyan]")
+                        
+                        results[scanner_name] = scanner.scan(args.url, verbose=args.verbose, delay=args.delay)
+                        progress.update(task, advance=1)
+                        time.sleep(0.5)  # Small delay for UI
                     
             elif args.type:
                 if args.type == 'xss-all':
                     # Run all XSS scanners
-                    xss_scanners = {k: v for k, v in self.scanners.items() if k.startswith('xss-') and k != 'xss-all'}
+                    xss_scanners = [k for k in self.scanners if k.startswith('xss-') and k != 'xss-all']
                     task = progress.add_task("[green]Running all XSS scans...", total=len(xss_scanners))
                     
-                    for scanner_name, scanner in xss_scanners.items():
-                        progress.update(task, description=f"[green]Running {scanner_name} scan...")
-                        if args.verbose:
-                            console.print(f"\n[bold cyan]Running {scanner_name} scan with verbose output:[/bold cyan]")
-                        results[scanner_name] = scanner.scan(args.url, verbose=args.verbose, delay=args.delay)
-                        progress.update(task, advance=1)
-                        time.sleep(0.5)  # Small delay for UI
+                    if args.parallel:
+                        results = self._run_scanners_concurrently(
+                            xss_scanners, args.url, args,
+                            on_complete=lambda name: progress.update(task, advance=1, description=f"[green]Finished {name} scan"))
+                    else:
+                        for scanner_name in xss_scanners:
+                            scanner = self.scanners[scanner_name]
+                            progress.update(task, description=f"[green]Running {scanner_name} scan...")
+                            if args.verbose:
+                                console.print(f"\n[bold cyan]Running {scanner_name} scan with verbose output:[/bold cyan]")
+                            results[scanner_name] = scanner.scan(args.url, verbose=args.verbose, delay=args.delay)
+                            progress.update(task, advance=1)
+                            time.sleep(0.5)  # Small delay for UI
                 else:
                     # Run a single scanner
                     task = progress.add_task(f"[green]Running {args.type} scan...", total=1)
@@ -203,7 +371,213 @@ class CyberNexus:
                 
         self._output_results(results, args.output, args.format, args.url)
     
+    def _run_scanners_concurrently(self, scan_types, url, args, on_complete=None):
+        """Run independent scanners against one target through a worker pool.
+        
+        All workers hit the same host; the shared HTTP client's per-host rate
+        limiter keeps their combined request rate within --delay/--rate.
+        """
+        workers = max(1, min(args.workers or len(scan_types), len(scan_types)))
+        results = {}
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.scanners[name].scan, url, verbose=args.verbose, delay=args.delay): name
+                for name in scan_types
+            }
+            for future in as_completed(futures):
+                scanner_name = futures[future]
+                try:
+                    results[scanner_name] = future.result()
+                except Exception as e:
+                    results[scanner_name] = [f"Error during {scanner_name} scan: {str(e)}"]
+                if on_complete:
+                    on_complete(scanner_name)
+        
+        # Keep the report in scanner order rather than completion order
+        return {name: results[name] for name in scan_types}
+    
+    async def _run_scanners_async(self, scan_types, url, args, on_complete=None):
+        """Asyncio counterpart of _run_scanners_concurrently.
+        
+        Scanners run as tasks on the current event loop; without --parallel
+        they run one at a time. Plugins that only provide a blocking scan()
+        are run in a worker thread.
+        """
+        import asyncio
+        
+        workers = max(1, min(args.workers or len(scan_types), len(scan_types))) if args.parallel else 1
+        semaphore = asyncio.Semaphore(workers)
+        
+        async def run(scanner_name):
+            scanner = self.scanners[scanner_name]
+            async with semaphore:
+                try:
+                    if hasattr(scanner, 'scan_async'):
+                        result = await scanner.scan_async(url, verbose=args.verbose, delay=args.delay)
+                    else:
+                        result = await asyncio.to_thread(scanner.scan, url, verbose=args.verbose, delay=args.delay)
+                except Exception as e:
+                    result = [f"Error during {scanner_name} scan: {str(e)}"]
+            if on_complete:
+                on_complete(scanner_name)
+            return scanner_name, result
+        
+        return dict(await asyncio.gather(*(run(name) for name in scan_types)))
+    
+    def _run_async(self, coro):
+        """Run a coroutine on a fresh event loop, closing the async HTTP session afterwards"""
+        import asyncio
+        
+        async def main():
+            try:
+                return await coro
+            finally:
+                await self.http.aclose()
+        
+        return asyncio.run(main())
+    
+    def _selected_scan_types(self, args):
+        """Resolve --all/--type into the list of scanners to run"""
+        if args.all:
+            return [k for k in self.scanners if k != 'xss-all']
+        if args.type == 'xss-all':
+            return [k for k in self.scanners if k.startswith('xss-') and k != 'xss-all']
+        if args.type:
+            return [args.type]
+        return []
+    
+    def _iter_targets(self, source):
+        """Lazily yield target URLs from a file (or stdin for '-'), skipping blanks and comments"""
+        stream = sys.stdin if source == '-' else open(source, 'r')
+        try:
+            for line in stream:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield line
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+    
+    def _scan_target(self, url, scan_types, args):
+        """Run the selected scanners against a single target of a batch scan"""
+        if args.parallel:
+            return self._run_scanners_concurrently(scan_types, url, args)
+        
+        results = {}
+        for scanner_name in scan_types:
+            try:
+                results[scanner_name] = self.scanners[scanner_name].scan(url, verbose=args.verbose, delay=args.delay)
+            except Exception as e:
+                results[scanner_name] = [f"Error during {scanner_name} scan: {str(e)}"]
+        return results
+    
+    def _handle_batch_scan(self, args):
+        """Scan every target from --targets through a bounded worker pool.
+        
+        Targets are read lazily, at most --concurrency of them are in flight at
+        once, and each target's results are printed (and appended to --output
+        as one JSON line) as soon as that target is done.
+        """
+        from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+        
+        scan_types = self._selected_scan_types(args)
+        if not scan_types:
+            console.print("[bold red]Error:[/bold red] Please specify a scan type or use --all")
+            return
+        if args.targets != '-' and not os.path.isfile(args.targets):
+            console.print(f"[bold red]Error:[/bold red] Targets file '{args.targets}' not found")
+            return
+        if args.output and args.format != 'json':
+            console.print("[yellow]Batch scans write JSON Lines output; ignoring --format[/yellow]")
+        
+        concurrency = max(1, args.concurrency)
+        output = open(args.output, 'w') if args.output else None
+        completed = 0
+        
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[bold blue]{task.description}"),
+                TimeElapsedColumn(),
+                console=console
+            ) as progress:
+                task = progress.add_task("[green]Scanning targets...", total=None)
+                
+                def emit(url, results):
+                    from utils.findings import to_serializable
+                    
+                    nonlocal completed
+                    self._output_results(results, target_url=url)
+                    if output:
+                        record = {
+                            "target": url,
+                            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                            "results": to_serializable(results)
+                        }
+                        output.write(json.dumps(record) + "\n")
+                        output.flush()
+                    completed += 1
+                    progress.update(task, description=f"[green]Scanned {completed} targets...")
+                
+                if args.engine == 'async':
+                    self._run_async(self._batch_scan_async(scan_types, args, concurrency, emit))
+                else:
+                    self._batch_scan_threads(scan_types, args, concurrency, emit)
+        finally:
+            if output:
+                output.close()
+        
+        console.print(f"\n[bold green]Batch scan finished: {completed} targets scanned[/bold green]")
+        if args.output:
+            console.print(f"[bold green]Results saved to {args.output}[/bold green]")
+    
+    def _batch_scan_threads(self, scan_types, args, concurrency, emit):
+        """Feed targets into a thread pool, keeping at most `concurrency` in flight"""
+        def result_of(future):
+            try:
+                return future.result()
+            except Exception as e:
+                return {"error": [f"Error scanning target: {str(e)}"]}
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = {}
+            for url in self._iter_targets(args.targets):
+                # Only pull the next target once a worker slot frees up
+                if len(pending) >= concurrency:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        emit(pending.pop(future), result_of(future))
+                pending[executor.submit(self._scan_target, url, scan_types, args)] = url
+            
+            for future in as_completed(pending):
+                emit(pending[future], result_of(future))
+    
+    async def _batch_scan_async(self, scan_types, args, concurrency, emit):
+        """Feed targets into asyncio tasks on one loop, keeping at most `concurrency` in flight"""
+        import asyncio
+        
+        async def scan_target(url):
+            try:
+                return url, await self._run_scanners_async(scan_types, url, args)
+            except Exception as e:
+                return url, {"error": [f"Error scanning target: {str(e)}"]}
+        
+        pending = set()
+        for url in self._iter_targets(args.targets):
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    emit(*task.result())
+            pending.add(asyncio.ensure_future(scan_target(url)))
+        
+        for task in asyncio.as_completed(pending):
+            emit(*(await task))
+    
     def _handle_profile_command(self, args):
+        from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
+        from rich.table import Table
+        
         if not args.profile_command:
             console.print("[bold red]Error:[/bold red] Please specify a profile subcommand")
             return
@@ -263,9 +637,9 @@ class CyberNexus:
                     
                     if scan_type == 'xss-all':
                         # Handle the special case for all XSS scans
-                        xss_scanners = {k: v for k, v in self.scanners.items() if k.startswith('xss-') and k != 'xss-all'}
-                        for xss_scanner_name, xss_scanner in xss_scanners.items():
-                            results[xss_scanner_name] = xss_scanner.scan(args.url)
+                        xss_scanners = [k for k in self.scanners if k.startswith('xss-') and k != 'xss-all']
+                        for xss_scanner_name in xss_scanners:
+                            results[xss_scanner_name] = self.scanners[xss_scanner_name].scan(args.url)
                     else:
                         results[scan_type] = self.scanners[scan_type].scan(args.url)
                     
@@ -275,6 +649,8 @@ class CyberNexus:
             self._output_results(results, args.output, args.format, args.url)
     
     def _handle_plugin_command(self, args):
+        from rich.table import Table
+        
         if not args.plugin_command:
             console.print("[bold red]Error:[/bold red] Please specify a plugin subcommand")
             return
@@ -315,7 +691,32 @@ class CyberNexus:
             else:
                 console.print(f"[bold red]Error adding plugin '{args.name}'[/bold red]")
     
+    def _handle_report_command(self, args):
+        from urllib.parse import urlparse
+        from utils.findings import read_jsonl
+        
+        if not os.path.exists(args.input):
+            console.print(f"[bold red]Error:[/bold red] {args.input} not found")
+            return
+        
+        # Regroup the streamed findings by scanner, as a live scan reports them
+        results = {}
+        hosts = set()
+        for finding in read_jsonl(args.input):
+            results.setdefault(finding.scanner, []).append(finding)
+            parsed = urlparse(finding.target)
+            hosts.add(f"{parsed.scheme}://{parsed.netloc}")
+        
+        if not results:
+            console.print(f"[yellow]No findings in {args.input}[/yellow]")
+            return
+        
+        self._output_results(results, args.output, args.format, ", ".join(sorted(hosts)))
+    
     def _run_interactive_mode(self):
+        from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
+        from rich.prompt import Prompt, Confirm
+        
         console.print("[bold cyan]Welcome to CyberNexus Interactive Mode![/bold cyan]")
         console.print("[dim]This mode will guide you through the scanning process.[/dim]\n")
         
@@ -374,6 +775,7 @@ class CyberNexus:
             "[bold]Enter delay between requests (seconds)[/bold]",
             default="0.5"
         ))
+        self.http.configure(rate=1 / delay if delay > 0 else 0)
         
         # Run the scans
         results = {}
@@ -393,9 +795,9 @@ class CyberNexus:
                 
                 if scan_type == 'xss-all':
                     # Handle the special case for all XSS scans
-                    xss_scanners = {k: v for k, v in self.scanners.items() if k.startswith('xss-') and k != 'xss-all'}
-                    for xss_scanner_name, xss_scanner in xss_scanners.items():
-                        results[xss_scanner_name] = xss_scanner.scan(url, verbose=verbose, delay=delay)
+                    xss_scanners = [k for k in self.scanners if k.startswith('xss-') and k != 'xss-all']
+                    for xss_scanner_name in xss_scanners:
+                        results[xss_scanner_name] = self.scanners[xss_scanner_name].scan(url, verbose=verbose, delay=delay)
                 else:
                     results[scan_type] = self.scanners[scan_type].scan(url, verbose=verbose, delay=delay)
                 
@@ -406,6 +808,11 @@ class CyberNexus:
         self._output_results(results, output_file, output_format, url)
     
     def _output_results(self, results, output_file=None, output_format="json", target_url=None):
+        from rich.markup import escape
+        from rich.tree import Tree
+        from utils.findings import Finding, Severity, to_serializable
+        from utils.script_cache import get_script_cache
+        
         # First, display results in the console
         console.print("\n[bold green]Scan Results:[/bold green]")
         
@@ -423,6 +830,19 @@ class CyberNexus:
                 
                 # Count issues by severity
                 for issue in scan_results:
+                    if isinstance(issue, Finding):
+                        if issue.severity >= Severity.HIGH:
+                            high_issues += 1
+                        elif issue.severity == Severity.MEDIUM:
+                            medium_issues += 1
+                        elif issue.severity == Severity.LOW:
+                            low_issues += 1
+                        total_issues += issue.is_issue
+                        scan_node.add(f"[{SEVERITY_STYLES[issue.severity.label]}]{escape(issue.message)}[/]")
+                        continue
+                    
+                    # Plugins may still return free-text strings or dicts
+                    issue = issue if isinstance(issue, str) else json.dumps(issue)
                     total_issues += 1
                     if "high" in issue.lower():
                         high_issues += 1
@@ -471,6 +891,23 @@ class CyberNexus:
         summary_node.add(f"[bold yellow]Medium Severity:[/bold yellow] {medium_issues}")
         summary_node.add(f"[bold blue]Low Severity:[/bold blue] {low_issues}")
         
+        # Reports rebuilt from a findings file never touched the network
+        stats = self._http.stats() if self._http else None
+        if stats:
+            summary_node.add(f"[dim]HTTP requests: {stats['requests']}, connections opened: "
+                             f"{stats['connections_opened']}, reused: {stats['connections_reused']}[/dim]")
+        if stats and 'response_cache' in stats:
+            summary_node.add(f"[dim]Response cache: {stats['response_cache']['hits']} hits, "
+                             f"{stats['response_cache']['misses']} misses[/dim]")
+        if stats and 'coalesced' in stats:
+            summary_node.add(f"[dim]Coalesced requests: {stats['coalesced']['joined']} joined in flight, "
+                             f"{stats['coalesced']['reused']} reused a completed response[/dim]")
+        scripts = get_script_cache() if self._http else None
+        if scripts:
+            script_stats = scripts.stats()
+            summary_node.add(f"[dim]Script cache: {script_stats['hits'] + script_stats['revalidated']} scripts reused, "
+                             f"{script_stats['downloads']} downloaded, {script_stats['analyses_reused']} analyses reused[/dim]")
+        
         console.print(tree)
         
         # Save results to file if requested
@@ -487,9 +924,10 @@ class CyberNexus:
                             "high_severity": high_issues,
                             "medium_severity": medium_issues,
                             "low_severity": low_issues
-                        }
+                        },
+                        "transport": stats
                     },
-                    "results": results
+                    "results": to_serializable(results)
                 }
                 
                 success = self.report_generator.generate_report(full_results, output_file, output_format)
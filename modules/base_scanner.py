@@ -0,0 +1,73 @@
+"""
+Base Scanner - Shared sync/async entry points for the built-in scanners
+"""
+
+from utils.http_client import HTTPClient
+from utils.scan_engine import run_flow, run_flow_async
+from utils.findings import Finding, emit
+from utils.scan_journal import get_journal
+from utils.payload_stats import get_stats
+
+class BaseScanner:
+    """Base class for scanners whose logic lives in a _scan() flow.
+
+    Subclasses implement _scan(url, verbose, delay) as a generator yielding
+    scan_engine steps. scan() keeps the original blocking interface used by
+    the CLI and plugins; scan_async() runs the same flow without blocking.
+    
+    Request pacing is done per host by the HTTP client's rate limiter; the
+    delay argument is kept for interface compatibility with plugins.
+    
+    Results are lists of utils.findings.Finding, tagged with scan_type; each
+    one is also handed to the active findings sink the moment it is created.
+    
+    With a scan journal active, a scanner that already completed against a
+    target returns its journaled results, and probes announced with a Unit
+    step are replayed instead of re-sent.
+    
+    With a payload stats store active, _ordered() puts the payloads that
+    worked best against the target's server fingerprint first and
+    _record_attempt() feeds each probe's outcome back into it.
+    """
+
+    scan_type = None
+
+    def __init__(self, http=None):
+        self.http = http or HTTPClient()
+
+    def scan(self, url, verbose=False, delay=0.5):
+        checkpoint = self._checkpoint(url)
+        results = checkpoint.results() if checkpoint else None
+        if results is not None:
+            return results
+        return run_flow(self._scan(url, verbose, delay), self.http, checkpoint)
+
+    async def scan_async(self, url, verbose=False, delay=0.5):
+        checkpoint = self._checkpoint(url)
+        results = checkpoint.results() if checkpoint else None
+        if results is not None:
+            return results
+        return await run_flow_async(self._scan(url, verbose, delay), self.http, checkpoint)
+
+    def _scan(self, url, verbose=False, delay=0.5):
+        raise NotImplementedError
+
+    def _checkpoint(self, url):
+        journal = get_journal()
+        return journal.checkpoint(url, self.scan_type) if journal and self.scan_type else None
+
+    def _ordered(self, family, payloads, server):
+        stats = get_stats()
+        return stats.order(server, family, payloads) if stats else list(payloads)
+
+    def _record_attempt(self, family, server, payload, hit):
+        stats = get_stats()
+        if stats:
+            stats.record(server, family, payload, hit)
+
+    def _finding(self, target, severity, message, **details):
+        finding = emit(Finding(self.scan_type, target, severity, message, **details))
+        journal = get_journal()
+        if journal:
+            journal.record_finding(finding)
+        return finding
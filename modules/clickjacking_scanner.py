@@ -2,46 +2,36 @@
 Clickjacking Scanner Module - Checks for X-Frame-Options and CSP frame-ancestors
 """
 
-import requests
 from urllib.parse import urlparse
 from rich.console import Console
 from colorama import Fore, Style
-import time
+from modules.base_scanner import BaseScanner
+from utils.scan_engine import Request
+from utils.findings import Severity
 
 console = Console()
 
-class ClickjackingScanner:
-    def __init__(self):
+class ClickjackingScanner(BaseScanner):
+    scan_type = 'clickjacking'
+
+    def __init__(self, http=None):
+        super().__init__(http)
         self.name = "Clickjacking Scanner"
         self.description = "Checks for X-Frame-Options and CSP frame-ancestors headers"
-        self.headers = {
-            'User-Agent': 'CyberNexus/1.0 Security Scanner',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'close',
-            'Upgrade-Insecure-Requests': '1'
-        }
         
-    def scan(self, url, verbose=False, delay=0.5):
+    def _scan(self, url, verbose=False, delay=0.5):
         if verbose:
             console.print(f"[bold blue]Starting Clickjacking scan on {url}[/bold blue]")
         else:
             print(f"{Fore.BLUE}[*] Starting Clickjacking scan on {url}{Style.RESET_ALL}")
         
-        results = {
-            'vulnerable': False,
-            'x_frame_options': None,
-            'csp_frame_ancestors': None,
-            'details': []
-        }
+        results = []
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = yield Request('GET', url, cache=True)
             
             # Check X-Frame-Options header
             x_frame_options = response.headers.get('X-Frame-Options', '').upper()
-            results['x_frame_options'] = x_frame_options
             
             if verbose:
                 if x_frame_options:
@@ -60,8 +50,6 @@ class ClickjackingScanner:
                         frame_ancestors = directive[len('frame-ancestors'):].strip()
                         break
             
-            results['csp_frame_ancestors'] = frame_ancestors
-            
             if verbose:
                 if frame_ancestors:
                     console.print(f"[green]CSP frame-ancestors directive found:[/green] {frame_ancestors}")
@@ -70,25 +58,24 @@ class ClickjackingScanner:
 
             # Determine vulnerability
             if not x_frame_options and not frame_ancestors:
-                results['vulnerable'] = True
-                results['details'].append("No X-Frame-Options or CSP frame-ancestors header found.")
+                results.append(self._finding(url, Severity.MEDIUM, "No X-Frame-Options or CSP frame-ancestors header found."))
                 if verbose:
                     console.print(f"[bold red]Potential Clickjacking vulnerability detected![/bold red]")
                 else:
                     print(f"{Fore.RED}[!] Potential Clickjacking vulnerability detected!{Style.RESET_ALL}")
             else:
-                results['details'].append("At least one protective header is present.")
+                evidence = f"X-Frame-Options: {x_frame_options or '-'}; frame-ancestors: {frame_ancestors or '-'}"
+                results.append(self._finding(url, Severity.INFO, "At least one protective header is present.", evidence=evidence))
                 if verbose:
                     console.print(f"[bold green]No Clickjacking vulnerability detected.[/bold green]")
                 else:
                     print(f"{Fore.GREEN}[+] No Clickjacking vulnerability detected.{Style.RESET_ALL}")
 
-        except requests.exceptions.RequestException as e:
-            results['details'].append(f"Error fetching URL: {str(e)}")
+        except Exception as e:
+            results.append(self._finding(url, Severity.INFO, f"Error fetching URL: {str(e)}"))
             if verbose:
                 console.print(f"[red]Error fetching URL:[/red] {e}")
             else:
                 print(f"{Fore.RED}[!] Error fetching URL: {e}{Style.RESET_ALL}")
         
-        time.sleep(delay)
         return results
@@ -0,0 +1,64 @@
+"""
+Scanner Registry - Resolves scanners by name and imports them only when selected
+"""
+
+import importlib
+import threading
+from collections.abc import Mapping
+
+# Scan type -> "module:Class". Nothing here is imported until it is used.
+SCANNERS = {
+    'xss-reflected': 'modules.xss.reflected_scanner:ReflectedXSSScanner',
+    'xss-dom': 'modules.xss.dom_scanner:DOMXSSScanner',
+    'xss-stored': 'modules.xss.stored_scanner:StoredXSSScanner',
+    'xss-all': None,  # Special case to run all XSS scanners
+    'clickjacking': 'modules.clickjacking_scanner:ClickjackingScanner',
+    'lfi': 'modules.lfi_scanner:LFIScanner',
+    'ssrf': 'modules.ssrf_scanner:SSRFScanner'
+}
+
+def load_scanner_class(target):
+    """Import and return the class named by a "module:Class" path"""
+    module_name, class_name = target.split(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+class ScannerRegistry(Mapping):
+    """Scan type -> scanner instance, built on first access.
+
+    Listing names (argparse choices, help, interactive menus) never imports
+    a scanner module; a scanner's module and its dependencies are loaded the
+    first time that scanner is actually looked up. make_kwargs is called at
+    that point to supply constructor arguments such as the shared HTTP client.
+    """
+
+    def __init__(self, make_kwargs=dict, scanners=None):
+        self._targets = dict(SCANNERS if scanners is None else scanners)
+        self._instances = {}
+        self._make_kwargs = make_kwargs
+        self._lock = threading.Lock()
+
+    def register(self, name, target):
+        """Add a scanner by "module:Class" path, or an already built instance"""
+        with self._lock:
+            if isinstance(target, str):
+                self._targets[name] = target
+                self._instances.pop(name, None)
+            else:
+                self._targets[name] = None
+                self._instances[name] = target
+
+    def __getitem__(self, name):
+        target = self._targets[name]
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = load_scanner_class(target)(**self._make_kwargs()) if target else None
+            return self._instances[name]
+
+    def __iter__(self):
+        return iter(self._targets)
+
+    def __len__(self):
+        return len(self._targets)
+
+    def __contains__(self, name):
+        return name in self._targets
@@ -1,38 +1,59 @@
-import requests
-import time
+from modules.base_scanner import BaseScanner
+from utils.scan_engine import Request, Unit
+from utils.findings import Severity
+from utils.payload_library import get_library
+from utils.response_fingerprint import ResponseTracker
+from utils.pattern_matcher import matcher_for
 
-class SSRFScanner:
-    def __init__(self):
+# Reading a probe response stops at the first of these
+SIGNATURES = matcher_for(("root:x", "meta-data"), ignore_case=True)
+
+class SSRFScanner(BaseScanner):
+    scan_type = 'ssrf'
+
+    def __init__(self, http=None):
+        super().__init__(http)
         self.name = "SSRF Scanner"
         self.description = "Scans for Server-Side Request Forgery vulnerabilities"
         
-    def scan(self, url, verbose=False, delay=0.5):
+    def _scan(self, url, verbose=False, delay=0.5):
         results = []
-        test_payloads = [
-            "http://127.0.0.1",
-            "http://localhost",
-            "http://169.254.169.254"  # AWS Metadata IP
-        ]
+        test_payloads = get_library().query('ssrf')
+        tracker = ResponseTracker()
 
         for payload in test_payloads:
             test_url = f"{url}?url={payload}"
+            replayed = yield Unit(test_url, 'url', payload)
+            if replayed is not None:
+                results.extend(replayed)
+                continue
+            
             try:
-                response = requests.get(test_url, timeout=10)
+                response = yield Request('GET', test_url, stop_at=SIGNATURES)
+                verdict = tracker.check(response)
+                if verdict != 'analyze':
+                    if verbose:
+                        print(f"[-] {verdict.capitalize()} response with: {payload}")
+                    if tracker.exhausted:
+                        if verbose:
+                            print(f"[!] Blocked {tracker.block_limit} times, skipping remaining payloads")
+                        break
+                    continue
+                
                 if "root:x" in response.text or "meta-data" in response.text.lower():
-                    results.append({
-                        'vulnerable': True,
-                        'payload': payload,
-                        'url': test_url,
-                        'evidence': response.text[:200]
-                    })
+                    results.append(self._finding(
+                        test_url, Severity.HIGH, f"SSRF detected with payload: {payload}",
+                        parameter='url', payload=payload,
+                        evidence=response.text[:200], evidence_offset=max(response.text.find("root:x"), response.text.lower().find("meta-data"))
+                    ))
                     if verbose:
                         print(f"[+] SSRF detected with payload: {payload}")
                 else:
+                    tracker.record(response, False)
                     if verbose:
                         print(f"[-] No SSRF detected with: {payload}")
-            except requests.RequestException as e:
+            except Exception as e:
                 if verbose:
                     print(f"[!] Request error with payload {payload}: {e}")
-            time.sleep(delay)
 
         return results
@@ -2,39 +2,42 @@
 DOM XSS Scanner Module - Detects DOM-based Cross-Site Scripting vulnerabilities
 """
 
-import requests
 from urllib.parse import urljoin, urlparse, parse_qs
+import hashlib
 import re
-import time
 import random
-from bs4 import BeautifulSoup
+import time
 from rich.console import Console
 from colorama import Fore, Style
+from modules.base_scanner import BaseScanner
+from utils.scan_engine import Request, Unit, Gather, Compute
+from utils.document import parse_document
+from utils.findings import Severity
+from utils.payload_library import get_library
+from utils.payload_stats import server_fingerprint
+from utils.response_fingerprint import ResponseTracker
+from utils.js_taint import ANALYSIS_VERSION, TaintFlow, analyze, contexts
+from utils.script_cache import content_digest, get_script_cache
+from utils.sink_matcher import SinkOccurrence, sink_matcher_for
 import json
 
 console = Console()
 
-class DOMXSSScanner:
-    def __init__(self):
+# Seconds all external scripts of a page must be fetched in
+SCRIPT_BUDGET = 30
+# Bytes read of an external script at most
+MAX_SCRIPT_SIZE = 5 * 1024 * 1024
+# Characters above which a script's taint analysis runs in a worker process
+TAINT_OFFLOAD_SIZE = 256 * 1024
+
+class DOMXSSScanner(BaseScanner):
+    scan_type = 'xss-dom'
+
+    def __init__(self, http=None):
+        super().__init__(http)
         self.name = "DOM XSS Scanner"
         self.description = "Detects DOM-based Cross-Site Scripting vulnerabilities"
         
-        # DOM XSS specific payloads
-        self.dom_payloads = [
-            "#<img src=x onerror=alert('XSS')>",
-            "#<script>alert('XSS')</script>",
-            "#javascript:alert('XSS')",
-            "#'-alert('XSS')-'",
-            "#'-alert(document.domain)-'",
-            "#<svg/onload=alert('XSS')>",
-            "?name=<img src=x onerror=alert('XSS')>",
-            "?q=<script>alert('XSS')</script>",
-            "?search=<svg/onload=alert('XSS')>",
-            "?id=<img src=x onerror=alert('XSS')>",
-            "?returnUrl=javascript:alert('XSS')",
-            "?returnUrl=data:text/html;base64,PHNjcmlwdD5hbGVydCgnWFNTJyk7PC9zY3JpcHQ+"
-        ]
-        
         # DOM sinks that are commonly vulnerable
         self.dom_sinks = [
             "document.URL",
@@ -68,16 +71,7 @@ class DOMXSSScanner:
         # Generate unique identifiers for each scan
         self.scan_id = f"domxss{random.randint(10000, 99999)}"
         
-        self.headers = {
-            'User-Agent': 'CyberNexus/1.0 Security Scanner',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'close',
-            'Upgrade-Insecure-Requests': '1'
-        }
-        
-    def scan(self, url, verbose=False, delay=0.5):
+    def _scan(self, url, verbose=False, delay=0.5):
         if verbose:
             console.print(f"[bold blue]Starting DOM XSS scan on {url}[/bold blue]")
         else:
@@ -87,72 +81,121 @@ class DOMXSSScanner:
         
         try:
             # First, analyze the page for potential DOM XSS sinks
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract all JavaScript from the page
-            scripts = soup.find_all('script')
-            inline_js = [script.string for script in scripts if script.string]
+            response = yield Request('GET', url, cache=True)
+            document = parse_document(response.text)
+            server = server_fingerprint(response)
+            tracker = ResponseTracker(baseline=response)
             
-            # Extract script sources
-            script_srcs = [script.get('src') for script in scripts if script.get('src')]
+            # Inline JavaScript and script sources come pre-indexed
+            inline_js = document.inline_scripts
+            script_srcs = document.script_srcs
             
-            # Check for DOM sinks in inline JavaScript
-            potential_sinks = []
-            for js in inline_js:
+            # Check for DOM sinks and source-to-sink flows in inline JavaScript;
+            # every sink occurrence is kept, with where it is, as evidence
+            sink_names = set()
+            sink_evidence = []
+            flows = []
+            for number, js in enumerate(inline_js, 1):
                 if js:
-                    for sink in self.dom_sinks:
-                        if sink in js:
-                            potential_sinks.append(sink)
-                            if verbose:
-                                console.print(f"[yellow]Potential DOM XSS sink found:[/yellow] {sink}")
-                            else:
-                                print(f"{Fore.YELLOW}[*] Potential DOM XSS sink found: {sink}{Style.RESET_ALL}")
+                    where = f"inline script #{number}"
+                    occurrences = self._find_sinks(js)
+                    sink_names.update(occurrence.name for occurrence in occurrences)
+                    sink_evidence.extend(self._report_sinks(occurrences, where, verbose))
+                    for flow in (yield from self._taint_flows(js)):
+                        flows.append((url, where, flow))
             
-            # Download and check external scripts
+            # Download and check external scripts concurrently, each distinct
+            # URL once and all within one time budget; each script is analysed
+            # as soon as it arrives (known ones come from the script cache)
+            scripts = {}
             for src in script_srcs:
-                script_url = urljoin(url, src)
-                try:
-                    script_response = requests.get(script_url, headers=self.headers, timeout=10)
-                    for sink in self.dom_sinks:
-                        if sink in script_response.text:
-                            potential_sinks.append(sink)
-                            if verbose:
-                                console.print(f"[yellow]Potential DOM XSS sink found in external script {src}:[/yellow] {sink}")
-                            else:
-                                print(f"{Fore.YELLOW}[*] Potential DOM XSS sink found in external script {src}: {sink}{Style.RESET_ALL}")
-                except Exception as e:
+                scripts.setdefault(urljoin(url, src), src)
+            deadline = time.monotonic() + SCRIPT_BUDGET
+            results = yield Gather([self._fetch_script(script_url, deadline) for script_url in scripts])
+            for (script_url, src), (sinks, script_flows, error) in zip(scripts.items(), results):
+                if error is not None:
                     if verbose:
-                        console.print(f"[red]Error fetching external script {src}:[/red] {str(e)}")
+                        console.print(f"[red]Error fetching external script {src}:[/red] {error}")
                     else:
-                        print(f"{Fore.RED}[!] Error fetching external script {src}: {str(e)}{Style.RESET_ALL}")
+                        print(f"{Fore.RED}[!] Error fetching external script {src}: {error}{Style.RESET_ALL}")
+                    continue
+                where = f"external script {src}"
+                sink_names.update(occurrence.name for occurrence in sinks)
+                sink_evidence.extend(self._report_sinks(sinks, where, verbose))
+                flows.extend((script_url, where, flow) for flow in script_flows)
+            
+            for target, where, flow in flows:
+                message = (f"DOM XSS data flow from {flow.source} to {flow.sink} in {where} "
+                           f"(line {flow.line}, column {flow.column})")
+                if verbose:
+                    console.print(f"[bold yellow]{message}[/bold yellow]")
+                else:
+                    print(f"{Fore.YELLOW}[!] {message}{Style.RESET_ALL}")
+                vulnerabilities.append(self._finding(
+                    target, Severity.MEDIUM, message, parameter=flow.source,
+                    evidence=f"{flow.source} -> {flow.sink} at line {flow.line}, column {flow.column}",
+                    evidence_offset=flow.offset
+                ))
             
             # Look for event handlers in HTML elements
-            for tag in soup.find_all():
-                for attr in tag.attrs:
-                    if attr.startswith('on'):  # Event handler
-                        if verbose:
-                            console.print(f"[yellow]Event handler found:[/yellow] <{tag.name} {attr}=\"{tag[attr]}\">")
-                        else:
-                            print(f"{Fore.YELLOW}[*] Event handler found: <{tag.name} {attr}=\"{tag[attr]}\">{Style.RESET_ALL}")
-                        potential_sinks.append(f"Event handler: {attr}")
+            for tag_name, attr, value in document.event_handlers:
+                if verbose:
+                    console.print(f"[yellow]Event handler found:[/yellow] <{tag_name} {attr}=\"{value}\">")
+                else:
+                    print(f"{Fore.YELLOW}[*] Event handler found: <{tag_name} {attr}=\"{value}\">{Style.RESET_ALL}")
+                sink_names.add(f"Event handler: {attr}")
+                sink_evidence.append(f"<{tag_name}> element: {attr} event handler")
             
-            # Test DOM XSS payloads
-            for payload in self.dom_payloads:
+            # Test DOM XSS payloads only where a source reaches a sink, and only
+            # in the URL parts those sources read (fragment, query); the ones
+            # that worked best against this server first, until the same block
+            # page keeps coming back
+            payloads = [payload for context in contexts([flow for _, _, flow in flows])
+                        for payload in get_library().query('xss-dom', context=context)]
+            if not flows:
+                if verbose:
+                    console.print("[dim]No source reaches a sink, skipping DOM XSS payloads[/dim]")
+                else:
+                    print(f"{Fore.BLUE}[*] No source reaches a sink, skipping DOM XSS payloads{Style.RESET_ALL}")
+            confirmed = []
+            for payload in self._ordered('xss-dom', payloads, server):
                 test_url = urljoin(url, payload)
+                replayed = yield Unit(test_url, None, payload)
+                if replayed is not None:
+                    confirmed.extend(replayed)
+                    continue
+                
                 if verbose:
                     console.print(f"[cyan]Testing DOM XSS payload:[/cyan] {payload}")
                 else:
                     print(f"{Fore.CYAN}[*] Testing DOM XSS payload: {payload}{Style.RESET_ALL}")
                 
-                if self._test_dom_xss(test_url, payload, verbose):
-                    vulnerabilities.append(f"Potential DOM XSS vulnerability found with payload: {payload}")
-                time.sleep(delay)  # Add delay between requests
+                offset = yield from self._test_dom_xss(test_url, payload, tracker, verbose)
+                self._record_attempt('xss-dom', server, payload, offset is not None)
+                if offset is not None:
+                    confirmed.append(self._finding(
+                        test_url, Severity.MEDIUM,
+                        f"Potential DOM XSS vulnerability found with payload: {payload}",
+                        payload=payload, evidence_offset=offset
+                    ))
+                if tracker.exhausted:
+                    if verbose:
+                        console.print(f"[yellow]Blocked {tracker.block_limit} times, skipping remaining DOM XSS payloads[/yellow]")
+                    else:
+                        print(f"{Fore.YELLOW}[*] Blocked {tracker.block_limit} times, skipping remaining DOM XSS payloads{Style.RESET_ALL}")
+                    break
             
-            # If we found potential sinks but no confirmed vulnerabilities, report them
-            if potential_sinks and not vulnerabilities:
-                sink_str = ", ".join(set(potential_sinks))
-                vulnerabilities.append(f"Potential DOM XSS sinks found but no confirmed vulnerabilities: {sink_str}")
+            vulnerabilities.extend(confirmed)
+            
+            # If we found potential sinks but no payload confirmed a vulnerability,
+            # report them, with every occurrence (one per line) as evidence
+            if sink_names and not confirmed:
+                sink_str = ", ".join(sorted(sink_names))
+                vulnerabilities.append(self._finding(
+                    url, Severity.LOW,
+                    f"Potential DOM XSS sinks found but no confirmed vulnerabilities: {sink_str}",
+                    evidence="\n".join(sink_evidence)
+                ))
                 
         except Exception as e:
             error_msg = f"Error during DOM XSS scan: {str(e)}"
@@ -160,52 +203,159 @@ class DOMXSSScanner:
                 console.print(f"[bold red]{error_msg}[/bold red]")
             else:
                 print(f"{Fore.RED}[!] {error_msg}{Style.RESET_ALL}")
-            return [error_msg]
+            return [self._finding(url, Severity.INFO, error_msg)]
             
         if not vulnerabilities:
-            vulnerabilities.append("No DOM XSS vulnerabilities found")
+            vulnerabilities.append(self._finding(url, Severity.INFO, "No DOM XSS vulnerabilities found"))
             
         return vulnerabilities
     
-    def _test_dom_xss(self, url, payload, verbose=False):
+    def _find_sinks(self, js):
+        # Every sink occurrence in js, with its line and column
+        return list(sink_matcher_for(tuple(self.dom_sinks)).finditer(js))
+    
+    def _report_sinks(self, occurrences, where, verbose=False):
+        # Print the sinks found in where (every occurrence when verbose, else
+        # each sink once with where it first occurs and how often it does)
+        # and return one evidence line per occurrence
+        first, counts = {}, {}
+        for occurrence in occurrences:
+            first.setdefault(occurrence.name, occurrence)
+            counts[occurrence.name] = counts.get(occurrence.name, 0) + 1
+            if verbose:
+                console.print(f"[yellow]Potential DOM XSS sink found in {where}:[/yellow] {occurrence.name} "
+                              f"(line {occurrence.line}, column {occurrence.column})")
+        if not verbose:
+            for name, occurrence in first.items():
+                more = f", {counts[name]} occurrences" if counts[name] > 1 else ""
+                print(f"{Fore.YELLOW}[*] Potential DOM XSS sink found in {where}: {name} "
+                      f"(line {occurrence.line}, column {occurrence.column}{more}){Style.RESET_ALL}")
+        return [f"{where}: {occurrence.name} at line {occurrence.line}, column {occurrence.column}"
+                for occurrence in occurrences]
+    
+    def _fetch_script(self, script_url, deadline):
+        # (sink occurrences, taint flows, None) for an external script, or
+        # (None, None, error message); errors stay with the script so one
+        # bad CDN does not end the scan
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None, None, f"time budget of {SCRIPT_BUDGET}s for external scripts exhausted"
+        try:
+            sinks, flows = yield from self._analyse_script(script_url, remaining)
+            return sinks, flows, None
+        except Exception as e:
+            return None, None, str(e) or type(e).__name__
+    
+    def _analyse_script(self, script_url, timeout=None):
+        # Sink occurrences and taint flows of an external script, of which at
+        # most MAX_SCRIPT_SIZE bytes are read. With a script cache, a script
+        # whose cached copy is still fresh (or revalidates with a 304) is not
+        # downloaded again, and a body analysed before is not re-analysed.
+        limits = {'max_body': MAX_SCRIPT_SIZE}
+        if timeout is not None:
+            limits['timeout'] = min(timeout, self.http.timeout)
+        cache = get_script_cache()
+        if cache is None:
+            response = yield Request('GET', script_url, cache=True, **limits)
+            js = response.text
+            return self._find_sinks(js), (yield from self._taint_flows(js))
+        
+        entry = cache.lookup(script_url)
+        if cache.usable(entry):
+            digest = entry.digest
+        else:
+            response = yield Request('GET', script_url, headers=cache.validators(entry), **limits)
+            digest = cache.store(script_url, response, entry)
+            if digest is None:
+                js = response.text
+                return self._find_sinks(js), (yield from self._taint_flows(js))
+        
+        # Results depend on the sink list, so it is part of the key
+        kind = 'sink-occurrences:' + hashlib.blake2b('\n'.join(self.dom_sinks).encode('utf-8'), digest_size=8).hexdigest()
+        js = None
+        sinks = cache.result(digest, kind)
+        if sinks is not None:
+            sinks = [SinkOccurrence(*sink) for sink in sinks]
+        else:
+            js = cache.content(digest).decode('utf-8', errors='replace')
+            sinks = self._find_sinks(js)
+            cache.save_result(digest, kind, sinks)
+        return sinks, (yield from self._taint_flows(js, digest))
+    
+    def _taint_flows(self, js, digest=None):
+        # Source-to-sink flows in js, from the script cache when the body was
+        # analysed before (js may then be None, given its digest). Large
+        # bundles are analysed in a worker process so scans of other targets
+        # are not held up.
+        cache = get_script_cache()
+        kind = f"taint:{ANALYSIS_VERSION}"
+        if cache is not None:
+            if digest is None:
+                digest = content_digest(js.encode('utf-8'))
+            flows = cache.result(digest, kind)
+            if flows is not None:
+                return [TaintFlow(*flow) for flow in flows]
+        if js is None:
+            js = cache.content(digest).decode('utf-8', errors='replace')
+        if len(js) > TAINT_OFFLOAD_SIZE:
+            flows = yield Compute(analyze, js)
+        else:
+            flows = analyze(js)
+        if cache is not None:
+            cache.save_result(digest, kind, flows)
+        return flows
+    
+    def _test_dom_xss(self, url, payload, tracker, verbose=False):
+        # Returns the offset of the payload in the response (-1 if it is only
+        # found in the parsed tree) when it lands somewhere executable, else None
         try:
             # Use a headless browser or specialized DOM XSS detection
             # For this evil, we'll use a simplified approach with regular requests
-            response = requests.get(url, headers=self.headers, timeout=10)
-            
-            # Check if our payload is reflected in a way that might execute
-            # This is a simplified check and might have false positives/negatives
-            
-            # Look for signs that the payload might have been executed
-            # For evil, if we see our payload in script tags or event handlers
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Check if payload appears in script tags
-            scripts = soup.find_all('script')
-            for script in scripts:
-                if script.string and payload in script.string:
-                    if verbose:
-                        console.print(f"[bold red]DOM XSS payload found in script tag![/bold red]")
-                    return True
+            response = yield Request('GET', url)
             
-            # Check if payload appears in event handlers
-            for tag in soup.find_all():
-                for attr, value in tag.attrs.items():
-                    if attr.startswith('on') and isinstance(value, str) and payload in value:
-                        if verbose:
-                            console.print(f"[bold red]DOM XSS payload found in {attr} event handler![/bold red]")
-                        return True
-            
-            # Check for signs of JavaScript execution
-            # This is a very simplified check and would need a real browser for accurate testing
-            if 'alert' in payload and 'alert' in response.text and payload in response.text:
+            # Block pages and responses identical to ones already analysed
+            # (fragment payloads never reach the server) are not parsed again
+            verdict = tracker.check(response)
+            if verdict != 'analyze':
                 if verbose:
-                    console.print(f"[bold red]DOM XSS payload potentially executed![/bold red]")
-                return True
-                
-            return False
+                    console.print(f"[dim]{verdict.capitalize()} response, not analysed[/dim]")
+                return None
+            
+            offset = self._payload_offset(response, payload, verbose)
+            tracker.record(response, offset is not None)
+            return offset
             
         except Exception as e:
             if verbose:
                 console.print(f"[red]Error testing DOM XSS:[/red] {str(e)}")
-            return False
\ No newline at end of file
+            return None
+    
+    def _payload_offset(self, response, payload, verbose=False):
+        # Check if our payload is reflected in a way that might execute
+        # This is a simplified check and might have false positives/negatives
+        
+        # Look for signs that the payload might have been executed
+        # For evil, if we see our payload in script tags or event handlers
+        document = parse_document(response.text)
+        
+        # Check if payload appears in script tags
+        if document.script_containing(payload) is not None:
+            if verbose:
+                console.print(f"[bold red]DOM XSS payload found in script tag![/bold red]")
+            return response.text.find(payload)
+        
+        # Check if payload appears in event handlers
+        match = document.attribute_containing(payload, handlers_only=True)
+        if match:
+            if verbose:
+                console.print(f"[bold red]DOM XSS payload found in {match[1]} event handler![/bold red]")
+            return response.text.find(payload)
+        
+        # Check for signs of JavaScript execution
+        # This is a very simplified check and would need a real browser for accurate testing
+        if 'alert' in payload and 'alert' in response.text and payload in response.text:
+            if verbose:
+                console.print(f"[bold red]DOM XSS payload potentially executed![/bold red]")
+            return response.text.find(payload)
+            
+        return None
@@ -2,75 +2,35 @@
 Reflected XSS Scanner Module - Detects Reflected Cross-Site Scripting vulnerabilities
 """
 
-import requests
 from urllib.parse import urljoin, urlparse, parse_qs
-import re
-import time
+import hashlib
 import random
-from bs4 import BeautifulSoup
 from rich.console import Console
 from colorama import Fore, Style
+from modules.base_scanner import BaseScanner
+from utils.scan_engine import Request, Unit, Gather
+from utils.document import parse_document
+from utils.findings import Severity
+from utils.reflection import classify, is_executable
+from utils.pattern_matcher import matcher_for
+from utils.payload_library import get_library
+from utils.payload_stats import server_fingerprint
+from utils.response_fingerprint import ResponseTracker
 
 console = Console()
 
-class ReflectedXSSScanner:
-    def __init__(self):
+class ReflectedXSSScanner(BaseScanner):
+    scan_type = 'xss-reflected'
+
+    def __init__(self, http=None):
+        super().__init__(http)
         self.name = "Reflected XSS Scanner"
         self.description = "Detects Reflected Cross-Site Scripting vulnerabilities"
         
-        # Basic payloads
-        self.basic_payloads = [
-            "<script>alert('XSS')</script>",
-            "<img src=x onerror=alert('XSS')>",
-            "<svg onload=alert('XSS')>",
-            "'\"><script>alert('XSS')</script>"
-        ]
-        
-        # Advanced payloads with encoding and filter evasion
-        self.advanced_payloads = [
-            "<script>alert(String.fromCharCode(88,83,83))</script>",
-            "<img src=x onerror=eval(atob('YWxlcnQoJ1hTUycpOw=='))>",
-            "<svg><animate onbegin=alert('XSS') attributeName=x dur=1s>",
-            "<body onload=alert('XSS')>",
-            "<iframe src=\"javascript:alert('XSS');\"></iframe>",
-            "<details open ontoggle=alert('XSS')>",
-            "<marquee onstart=alert('XSS')>",
-            "javascript:/*--></title></style></script></xmp><svg/onload='+/\"/+/onmouseover=1/+/[*/[]/+alert(1)//'>",
-            "<svg><script>alert('XSS')</script></svg>",
-            "<svg><script>alert&DiacriticalGrave;1&DiacriticalGrave;</script></svg>",
-            "<img src=1 href=1 onerror=\"javascript:alert('XSS')\">"
-        ]
-        
-        # Event handler payloads
-        self.event_handler_payloads = [
-            "\" onmouseover=\"alert('XSS')\" \"",
-            "\" onfocus=\"alert('XSS')\" autofocus \"",
-            "\" onblur=\"alert('XSS')\" autofocus \"",
-            "\" onkeydown=\"alert('XSS')\" \"",
-            "\" onload=\"alert('XSS')\" \"",
-            "\" onerror=\"alert('XSS')\" \""
-        ]
-        
-        # DOM-based XSS payloads that might also trigger reflected XSS
-        self.dom_payloads = [
-            "#<script>alert('XSS')</script>",
-            "?q=<script>alert('XSS')</script>",
-            "javascript:alert('XSS')//"
-        ]
-        
         # Generate unique identifiers for each scan to detect blind XSS
         self.scan_id = f"xss{random.randint(10000, 99999)}"
         
-        self.headers = {
-            'User-Agent': 'CyberNexus/1.0 Security Scanner',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'close',
-            'Upgrade-Insecure-Requests': '1'
-        }
-        
-    def scan(self, url, verbose=False, delay=0.5):
+    def _scan(self, url, verbose=False, delay=0.5):
         if verbose:
             console.print(f"[bold blue]Starting Reflected XSS scan on {url}[/bold blue]")
         else:
@@ -80,73 +40,35 @@ class ReflectedXSSScanner:
         
         # First, crawl the page to find forms and parameters
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = yield Request('GET', url, cache=True)
+            document = parse_document(response.text)
+            server = server_fingerprint(response)
+            tracker = ResponseTracker(baseline=response)
             
-            # Check URL parameters
+            # Check URL parameters; parameters are tested concurrently and
+            # their findings kept in parameter order
             parsed_url = urlparse(url)
             if parsed_url.query:
-                params = parse_qs(parsed_url.query)
+                params = list(parse_qs(parsed_url.query))
+                url_request = lambda values: Request('GET', self._build_test_url(url, values))
+                contexts = yield from self._probe_canaries(url, params, url_request, verbose)
+                tests = []
                 for param in params:
                     if verbose:
                         console.print(f"[cyan]Testing URL parameter:[/cyan] {param}")
                     else:
                         print(f"{Fore.CYAN}[*] Testing URL parameter: {param}{Style.RESET_ALL}")
                     
-                    # Test with basic payloads first
-                    for payload in self.basic_payloads:
-                        test_url = self._build_test_url(url, param, payload)
-                        if self._test_xss(test_url, payload, verbose):
-                            vulnerabilities.append(f"Reflected XSS found in URL parameter '{param}' with payload: {payload}")
-                            break
-                    
-                    # If no vulnerability found with basic payloads, try advanced ones
-                    if not any(param in vuln for vuln in vulnerabilities):
-                        for payload in self.advanced_payloads:
-                            test_url = self._build_test_url(url, param, payload)
-                            if self._test_xss(test_url, payload, verbose):
-                                vulnerabilities.append(f"Reflected XSS found in URL parameter '{param}' with payload: {payload}")
-                                break
-                            time.sleep(delay)  # Add delay between requests
+                    tests.append(self._test_parameter(
+                        url, param, "URL parameter", contexts[param], url_request, server, tracker.parameter(), verbose
+                    ))
+                for findings in (yield Gather(tests)):
+                    vulnerabilities.extend(findings)
             
-            # Check forms
-            forms = soup.find_all('form')
-            for i, form in enumerate(forms):
-                if verbose:
-                    console.print(f"[cyan]Testing form #{i+1}[/cyan]")
-                else:
-                    print(f"{Fore.CYAN}[*] Testing form #{i+1}{Style.RESET_ALL}")
-                
-                form_action = form.get('action', '')
-                form_method = form.get('method', 'get').lower()
-                form_url = urljoin(url, form_action) if form_action else url
-                
-                inputs = form.find_all(['input', 'textarea'])
-                for input_field in inputs:
-                    input_name = input_field.get('name')
-                    input_type = input_field.get('type', '')
-                    
-                    if not input_name:
-                        continue
-                        
-                    if verbose:
-                        console.print(f"[cyan]Testing form input:[/cyan] {input_name} (type: {input_type})")
-                    else:
-                        print(f"{Fore.CYAN}[*] Testing form input: {input_name} (type: {input_type}){Style.RESET_ALL}")
-                    
-                    # Select payloads based on input type
-                    payloads = self.basic_payloads
-                    
-                    if input_type.lower() in ['text', 'search', 'url', 'email', 'textarea']:
-                        payloads = self.basic_payloads + self.advanced_payloads
-                    elif input_type.lower() in ['button', 'submit']:
-                        payloads = self.event_handler_payloads
-                    
-                    for payload in payloads:
-                        if self._test_form_xss(form_url, form_method, input_name, payload, inputs, verbose):
-                            vulnerabilities.append(f"Reflected XSS found in form input '{input_name}' with payload: {payload}")
-                            break
-                        time.sleep(delay)  # Add delay between requests
+            # Check forms, concurrently as well, in form order
+            forms = [self._test_form(url, i, form, server, tracker, verbose) for i, form in enumerate(document.forms)]
+            for findings in (yield Gather(forms)):
+                vulnerabilities.extend(findings)
                             
         except Exception as e:
             error_msg = f"Error during XSS scan: {str(e)}"
@@ -154,17 +76,55 @@ class ReflectedXSSScanner:
                 console.print(f"[bold red]{error_msg}[/bold red]")
             else:
                 print(f"{Fore.RED}[!] {error_msg}{Style.RESET_ALL}")
-            return [error_msg]
+            return [self._finding(url, Severity.INFO, error_msg)]
             
         if not vulnerabilities:
-            vulnerabilities.append("No Reflected XSS vulnerabilities found")
+            vulnerabilities.append(self._finding(url, Severity.INFO, "No Reflected XSS vulnerabilities found"))
             
         return vulnerabilities
     
-    def _build_test_url(self, url, param, payload):
+    def _test_form(self, url, index, form, server, tracker, verbose=False):
+        # Canary-probe a form's inputs, then test the reflected ones concurrently
+        if verbose:
+            console.print(f"[cyan]Testing form #{index+1}[/cyan]")
+        else:
+            print(f"{Fore.CYAN}[*] Testing form #{index+1}{Style.RESET_ALL}")
+        
+        form_method = form.method
+        form_url = urljoin(url, form.action) if form.action else url
+        
+        inputs = form.inputs
+        names = list(dict.fromkeys(field.get('name') for field in inputs if field.get('name')))
+        form_request = lambda values: self._form_request(form_url, form_method, values, inputs)
+        contexts = yield from self._probe_canaries(form_url, names, form_request, verbose)
+        
+        tests = []
+        for input_field in inputs:
+            input_name = input_field.get('name')
+            input_type = input_field.get('type', '')
+            
+            if not input_name or input_name not in contexts:
+                continue
+                
+            if verbose:
+                console.print(f"[cyan]Testing form input:[/cyan] {input_name} (type: {input_type})")
+            else:
+                print(f"{Fore.CYAN}[*] Testing form input: {input_name} (type: {input_type}){Style.RESET_ALL}")
+            
+            tests.append(self._test_parameter(
+                form_url, input_name, "form input", contexts.pop(input_name), form_request, server, tracker.parameter(), verbose
+            ))
+        
+        findings = []
+        for results in (yield Gather(tests)):
+            findings.extend(results)
+        return findings
+    
+    def _build_test_url(self, url, values):
         parsed = urlparse(url)
         params = parse_qs(parsed.query)
-        params[param] = [payload]
+        for param, value in values.items():
+            params[param] = [value]
         
         # Rebuild query string
         query_string = "&".join([f"{k}={v[0]}" for k, v in params.items()])
@@ -172,19 +132,134 @@ class ReflectedXSSScanner:
         # Rebuild URL
         return parsed._replace(query=query_string).geturl()
     
-    def _test_xss(self, url, payload, verbose=False):
-        try:
+    def _test_parameter(self, target, param, label, contexts, request_for, server, tracker, verbose=False):
+        # Send the payloads for the contexts the parameter's canary was
+        # reflected in, the ones that worked best against this server first,
+        # until one hits or the same block page keeps coming back;
+        # request_for({param: value}) builds the probe request
+        if not contexts:
             if verbose:
-                console.print(f"[dim]Testing payload:[/dim] {payload}")
+                console.print(f"[dim]Not reflected, skipping payloads:[/dim] {label} '{param}'")
+            return []
+        
+        if verbose:
+            kinds = ', '.join(sorted({context.kind for context in contexts}))
+            console.print(f"[yellow]Reflected in {kinds}:[/yellow] {label} '{param}'")
+        
+        findings = []
+        for payload in self._ordered('xss', self._payloads_for(contexts), server):
+            replayed = yield Unit(target, param, payload)
+            if replayed is not None:
+                findings.extend(replayed)
+                if replayed:
+                    break
+                continue
             
-            response = requests.get(url, headers=self.headers, timeout=10)
-            return self._check_reflection(response.text, payload, verbose)
+            offset = yield from self._test_xss(request_for({param: payload}), payload, tracker, verbose)
+            self._record_attempt('xss', server, payload, offset is not None)
+            if offset is not None:
+                findings.append(self._finding(
+                    target, Severity.HIGH,
+                    f"Reflected XSS found in {label} '{param}' with payload: {payload}",
+                    parameter=param, payload=payload, evidence_offset=offset
+                ))
+                break
+            if tracker.exhausted:
+                if verbose:
+                    console.print(f"[yellow]Blocked {tracker.block_limit} times, skipping remaining payloads:[/yellow] {label} '{param}'")
+                else:
+                    print(f"{Fore.YELLOW}[*] Blocked {tracker.block_limit} times, skipping remaining payloads: {label} '{param}'{Style.RESET_ALL}")
+                break
+        
+        return findings
+    
+    def _canary(self, target, param):
+        # Unique per target and parameter, and stable across runs so resumed
+        # scans probe the same way
+        digest = hashlib.blake2b(f"{target}\x1f{param}".encode('utf-8'), digest_size=5).hexdigest()
+        return f"cnx{digest}"
+    
+    def _probe_canaries(self, target, params, request_for, verbose=False):
+        # Canary first, batched: every parameter of the endpoint gets its own
+        # tagged canary in a single request and reflections are attributed by
+        # tag. The batch is bisected when the server rejects the combined
+        # request or when canaries collide in the same script, attribute or
+        # text node (one parameter may be shaping another's context).
+        # Returns {param: set of contexts}, empty sets for unreflected ones.
+        if not params:
+            return {}
+        
+        canaries = {param: self._canary(target, param) for param in params}
+        try:
+            response = yield request_for(canaries)
         except Exception as e:
             if verbose:
-                console.print(f"[red]Error testing XSS:[/red] {str(e)}")
-            return False
+                console.print(f"[red]Error sending canaries:[/red] {str(e)}")
+            response = None
+        
+        if len(params) > 1 and (response is None or response.status_code >= 400):
+            if verbose:
+                console.print(f"[dim]Combined canary request rejected, splitting {len(params)} parameters[/dim]")
+            return (yield from self._bisect_canaries(target, params, request_for, verbose))
+        
+        if response is None:
+            return {param: set() for param in params}
+        
+        contexts, collided = self._reflection_contexts(response, canaries)
+        if len(params) > 1 and collided:
+            if verbose:
+                console.print(f"[dim]Canaries collided, re-probing:[/dim] {', '.join(collided)}")
+            contexts.update((yield from self._bisect_canaries(target, collided, request_for, verbose)))
+        return contexts
+    
+    def _bisect_canaries(self, target, params, request_for, verbose=False):
+        middle = len(params) // 2
+        contexts = yield from self._probe_canaries(target, params[:middle], request_for, verbose)
+        contexts.update((yield from self._probe_canaries(target, params[middle:], request_for, verbose)))
+        return contexts
+    
+    def _reflection_contexts(self, response, canaries):
+        # Find all canaries in one pass (on the raw body first, so a response
+        # without any is never decoded) and classify them in one lexer pass.
+        # Returns ({param: set of reflection Contexts}, list of params whose
+        # canaries shared a segment)
+        contexts = {param: set() for param in canaries}
+        matcher = matcher_for(tuple(canaries.values()))
+        if not matcher.found(response.content):
+            return contexts, []
+        
+        content = response.text
+        params = {canary: param for param, canary in canaries.items()}
+        owners = {offset: params[canary] for offset, canary in matcher.finditer(content)}
+        if not owners:
+            return contexts, []
+        
+        segments = {}
+        for offset, context in classify(content, owners).items():
+            contexts[owners[offset]].add(context)
+            segments.setdefault((context.kind, context.start), set()).add(owners[offset])
+        
+        collided = set()
+        for params in segments.values():
+            if len(params) > 1:
+                collided.update(params)
+        return contexts, [param for param in canaries if param in collided]
     
-    def _test_form_xss(self, form_url, form_method, input_name, payload, all_inputs, verbose=False):
+    def _payloads_for(self, contexts):
+        # Only payloads able to break out of the contexts the canary landed in,
+        # from the 'xss' corpus family indexed by reflection context (see
+        # utils.reflection). {q} is the enclosing quote, {tag} the element and
+        # {close} what ends a JavaScript comment.
+        payloads = []
+        for context in sorted(contexts, key=lambda context: context.start):
+            close = '\n' if context.quote == '//' else '*/'
+            for template in get_library().query('xss', context=context.kind):
+                payload = template.replace('{q}', context.quote).replace('{tag}', context.tag or '').replace('{close}', close)
+                if payload not in payloads:
+                    payloads.append(payload)
+        return payloads
+    
+    def _form_request(self, form_url, form_method, values, all_inputs):
         data = {}
         
         # Fill all inputs with dummy data
@@ -193,55 +268,62 @@ class ReflectedXSSScanner:
             if name:
                 data[name] = "test"
         
-        # Replace target input with payload
-        data[input_name] = payload
+        # Replace the target inputs with the probe values
+        data.update(values)
         
+        if form_method == 'post':
+            return Request('POST', form_url, data=data)
+        return Request('GET', form_url, params=data)
+    
+    def _test_xss(self, request, payload, tracker, verbose=False):
         try:
             if verbose:
-                console.print(f"[dim]Testing form payload:[/dim] {payload}")
+                console.print(f"[dim]Testing payload:[/dim] {payload}")
             
-            if form_method == 'post':
-                response = requests.post(form_url, data=data, headers=self.headers, timeout=10)
-            else:
-                response = requests.get(form_url, params=data, headers=self.headers, timeout=10)
-                
-            return self._check_reflection(response.text, payload, verbose)
+            response = yield request
+            verdict = tracker.check(response)
+            if verdict != 'analyze':
+                if verbose:
+                    console.print(f"[dim]{verdict.capitalize()} response, not analysed[/dim]")
+                return None
+            
+            offset = self._check_reflection(response, payload, verbose)
+            tracker.record(response, offset is not None)
+            return offset
         except Exception as e:
             if verbose:
-                console.print(f"[red]Error testing form XSS:[/red] {str(e)}")
-            return False
+                console.print(f"[red]Error testing XSS:[/red] {str(e)}")
+            return None
     
-    def _check_reflection(self, content, payload, verbose=False):
-        # Check if the payload is reflected in the response
+    def _check_reflection(self, response, payload, verbose=False):
+        # Returns the offset of a reflection of payload whose code ends up
+        # somewhere it executes (script code, an event handler or a
+        # javascript: URL), or None. Reflections that stay inside a string,
+        # attribute value, comment etc. were neutralized and do not count.
+        # Most probes are not reflected verbatim: the raw body is checked
+        # first and only decoded and lexed (around the matches) on a hit.
+        matcher = matcher_for((payload,))
+        if not matcher.found(response.content):
+            return None
         
-        # Remove whitespace for more accurate matching
-        normalized_payload = re.sub(r'\s+', '', payload)
-        normalized_content = re.sub(r'\s+', '', content)
+        content = response.text
+        offsets = [offset for offset, _ in matcher.finditer(content)]
+        if not offsets:
+            return None
         
-        if normalized_payload in normalized_content:
-            # Check context of reflection
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Check if it's inside a script tag
-            scripts = soup.find_all('script')
-            for script in scripts:
-                if payload in script.string if script.string else '':
-                    if verbose:
-                        console.print(f"[bold red]XSS payload found in script tag![/bold red]")
-                    return True
-            
-            # Check if it's in an attribute
-            for tag in soup.find_all():
-                for attr, value in tag.attrs.items():
-                    if isinstance(value, str) and payload in value:
-                        if verbose:
-                            console.print(f"[bold red]XSS payload found in {tag.name} {attr} attribute![/bold red]")
-                        return True
-            
-            # Check if it's directly in HTML
-            if payload in content:
+        marker = next((m for m in ('alert', 'eval', 'confirm', 'prompt') if m in payload), None)
+        if marker is None:
+            return offsets[0]
+        
+        shift = payload.index(marker)
+        contexts = classify(content, [offset + shift for offset in offsets])
+        for offset in offsets:
+            context = contexts.get(offset + shift)
+            if context and is_executable(content, context):
                 if verbose:
-                    console.print(f"[bold red]XSS payload found in HTML content![/bold red]")
-                return True
-            
-        return False
\ No newline at end of file
+                    console.print(f"[bold red]XSS payload executes in {context.kind} context![/bold red]")
+                return offset
+        
+        if verbose:
+            console.print(f"[dim]Payload reflected but neutralized[/dim]")
+        return None
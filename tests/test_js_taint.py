@@ -0,0 +1,69 @@
+import pytest
+
+from utils.js_taint import TaintFlow, analyze, contexts, tokenize
+
+# (script, expected (source, sink) flows in order)
+CASES = [
+    ('el.innerHTML = location.hash;', [('location.hash', 'innerHTML')]),
+    ('el.innerHTML = window.location.hash.slice(1);', [('location.hash', 'innerHTML')]),
+    ('eval(location.search)', [('location.search', 'eval')]),
+    ('document.write("<a href=" + document.referrer + ">")', [('document.referrer', 'document.write')]),
+    ('$(x).html(window.name)', [('window.name', 'html')]),
+    ('setTimeout(`go(${location.hash})`, 0)', [('location.hash', 'setTimeout')]),
+    # Aliasing through variables, in any order and across reassignments
+    ('var h = location.hash; el.innerHTML = h;', [('location.hash', 'innerHTML')]),
+    ('var a = location.hash; var b = "x" + a; var c = b; eval(c);', [('location.hash', 'eval')]),
+    ('function f() { el.innerHTML = later; } var later = document.URL;', [('document.URL', 'innerHTML')]),
+    ('var o = location; el.innerHTML = o.hash;', []),
+    ('var s = location.search; s += ""; el.outerHTML = s.toUpperCase();', [('location.search', 'outerHTML')]),
+    # Sanitizers stop the taint
+    ('el.innerHTML = encodeURIComponent(location.hash);', []),
+    ('var h = DOMPurify.sanitize(location.hash); el.innerHTML = h;', []),
+    ('el.innerHTML = parseInt(location.hash.slice(1), 10);', []),
+    ('el.innerHTML = escape(location.hash) + location.search;', [('location.search', 'innerHTML')]),
+    # Not flows
+    ('el.textContent = location.hash;', []),
+    ('el.innerHTML = "static"; var h = location.hash;', []),
+    ('var location = {}; el.innerHTML = "location.hash";', []),
+    ('// el.innerHTML = location.hash\nx = 1;', []),
+    ('/* eval(location.hash) */', []),
+    ('el.innerHTML = { h: location.hash };', []),
+    ('evaluate(location.hash); my_eval(window.name);', []),
+    ('var r = /"/g; el.innerHTML = location.hash;', [('location.hash', 'innerHTML')]),
+    ('var q = a / b; eval(location.search) / 2', [('location.search', 'eval')]),
+]
+
+@pytest.mark.parametrize('script, flows', CASES)
+def test_analyze(script, flows):
+    assert [(flow.source, flow.sink) for flow in analyze(script)] == flows
+
+def test_flow_location():
+    script = 'var h = location.hash;\n  el.innerHTML = h;'
+    [flow] = analyze(script)
+    assert flow == TaintFlow('location.hash', 'innerHTML', script.index('el.innerHTML'), 2, 3)
+
+def test_flows_in_order_of_sink():
+    script = 'eval(window.name); el.innerHTML = location.hash; eval(location.search)'
+    assert [flow.offset for flow in analyze(script)] == sorted(flow.offset for flow in analyze(script))
+    assert len(analyze(script)) == 3
+
+def test_contexts():
+    flows = analyze('eval(location.search); el.innerHTML = location.hash; eval(window.name)')
+    assert contexts(flows) == ['fragment', 'query']
+    assert contexts(analyze('eval(document.referrer)')) == []
+    assert contexts(analyze('eval(document.URL)')) == ['fragment', 'query']
+
+@pytest.mark.parametrize('script, kinds', [
+    ('a = b / c / d', ['name', 'punct', 'name', 'punct', 'name', 'punct', 'name']),
+    ('a = /x/g.test(b)', ['name', 'punct', 'regex', 'punct', 'name', 'punct', 'name', 'punct']),
+    ('return /x/', ['name', 'regex']),
+    ('f(a) / 2', ['name', 'punct', 'name', 'punct', 'punct', 'number']),
+    ("x = 'a/b' // c", ['name', 'punct', 'string']),
+    ('x = `a ${b}`', ['name', 'punct', 'template']),
+])
+def test_tokenize(script, kinds):
+    assert tokenize(script).kinds == kinds
+
+def test_member_chains_are_one_token():
+    assert tokenize('window . location?.hash').texts == ['window.location.hash']
+    assert tokenize('$(x).html(y)').texts[5] == '.html'
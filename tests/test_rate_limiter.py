@@ -0,0 +1,22 @@
+from utils.rate_limiter import HostRateLimiter
+
+URL = 'http://h/'
+
+def backoffs(latencies):
+    limiter = HostRateLimiter(rate=100)
+    for latency in latencies:
+        limiter.record(URL, 200, latency)
+    return limiter.stats()['backoffs']
+
+def test_jitter_on_fast_host_is_not_congestion():
+    assert backoffs([0.0005] * 5 + [0.002, 0.004, 0.0005, 0.003]) == 0
+
+def test_latency_spike_backs_off():
+    assert backoffs([0.02] * 5 + [0.2]) == 1
+
+def test_error_statuses_back_off():
+    limiter = HostRateLimiter(rate=100)
+    limiter.record(URL, 429, 0.01)
+    limiter.record(URL, None, 0.01)
+    assert limiter.stats()['backoffs'] == 2
+    assert limiter.stats()['host_rates']['h'] == 25
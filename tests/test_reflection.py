@@ -0,0 +1,72 @@
+import pytest
+
+from modules.xss.reflected_scanner import ReflectedXSSScanner
+from utils.http_client import HTTPResponse
+from utils.reflection import classify, is_executable
+
+# (document, expected kind at the X)
+CASES = [
+    ('<p>X</p>', 'html'),
+    ('<a title="X">', 'attribute'),
+    ("<a title='X'>", 'attribute'),
+    ('<a href="X">', 'url-attribute'),
+    ('<div onclick="X">', 'event-handler'),
+    ('<!-- X -->', 'comment'),
+    ('<textarea>X</textarea>', 'rcdata'),
+    ('<style>X</style>', 'style'),
+    ('<script>X</script>', 'js-code'),
+    ('<script>var s = "X";</script>', 'js-string'),
+    ("<script>var s = 'a\\'X';</script>", 'js-string'),
+    ('<script>var s = `a X`;</script>', 'js-template'),
+    ('<script>var s = `a ${X}`;</script>', 'js-code'),
+    ('<script>var s = `a ${b} X`;</script>', 'js-template'),
+    ('<script>// X\n</script>', 'js-comment'),
+    ('<script>/* X */</script>', 'js-comment'),
+    ('<script>/* a */ X</script>', 'js-code'),
+    ('<script>var s = "a"; // "\nX</script>', 'js-code'),
+    # Regular expression literals and divisions
+    ('<script>var r = /X/g;</script>', 'js-regex'),
+    ("<script>var r = /a'/g; X</script>", 'js-code'),
+    ("<script>var r = /a'/g; var s = 'X';</script>", 'js-string'),
+    ('<script>var r = /["\']/g.test(X);</script>', 'js-code'),
+    ("<script>var r = /[/']/; X</script>", 'js-code'),
+    ('<script>var r = /\\/\'/; X</script>', 'js-code'),
+    ("<script>return /'/.test(a) && X</script>", 'js-code'),
+    ("<script>var d = a / b; var s = 'X';</script>", 'js-string'),
+    ("<script>var d = f(a) / 2 / 'X'</script>", 'js-string'),
+    ("<script>var d = x[0] / 2; X / 3</script>", 'js-code'),
+    ("<script>var d = 'a' / 2 / X</script>", 'js-code'),
+    ("<script>var d = 10 / 2; 'X'</script>", 'js-string'),
+    ("<script>var d = a /* c */ / 2; X</script>", 'js-code'),
+]
+
+@pytest.mark.parametrize('document, kind', CASES)
+def test_classify(document, kind):
+    offset = document.index('X')
+    assert classify(document, [offset])[offset].kind == kind
+
+def test_classify_leaves_offsets_past_the_end_out():
+    assert classify('<p>a</p>', [3, 100]) == {3: classify('<p>a</p>', [3])[3]}
+
+def test_same_segment_same_start():
+    document = '<script>var s = "X Y"; var t = "Z";</script>'
+    contexts = classify(document, [document.index(c) for c in 'XYZ'])
+    x, y, z = (contexts[document.index(c)] for c in 'XYZ')
+    assert x.start == y.start != z.start
+
+def test_javascript_url_is_executable():
+    document = '<a href=" javascript:X">'
+    context = classify(document, [document.index('X')])[document.index('X')]
+    assert is_executable(document, context)
+
+def test_quote_in_regex_literal_does_not_open_a_string():
+    # A neutralized reflection after a regex literal with a quote in it
+    # used to be reported as executable
+    payload = ';alert(document.domain);//'
+    body = f"<script>var r = /a'/g; var s = '{payload}';</script>"
+    response = HTTPResponse('http://example.com/', 200, {}, body.encode('utf-8'))
+    assert ReflectedXSSScanner()._check_reflection(response, payload) is None
+
+    body = f"<script>var r = /a'/g; var s = ''{payload}';</script>"
+    response = HTTPResponse('http://example.com/', 200, {}, body.encode('utf-8'))
+    assert ReflectedXSSScanner()._check_reflection(response, payload) == body.index(payload)
@@ -0,0 +1,111 @@
+import pytest
+
+from utils.request_coalescer import RequestCoalescer, normalize_url
+
+@pytest.mark.parametrize('a, b', [
+    ('http://h/#<img src=x>', 'http://h/#<svg>'),
+    ('http://h/p#x', 'http://h/p'),
+    ('http://h', 'http://h/'),
+    ('HTTP://Host/p', 'http://host/p'),
+    ('http://h:80/p', 'http://h/p'),
+    ('https://h:443/p', 'https://h/p'),
+    ('http://h/?a=1&b=2', 'http://h/?b=2&a=1'),
+    ('http://h/?a=1&id=1&id=2', 'http://h/?id=1&a=1&id=2'),
+    ('http://h/?q=<x>', 'http://h/?q=%3Cx%3E'),
+    ('http://h/?q=a b', 'http://h/?q=a%20b'),
+    ('http://h/?a=1&&b=2', 'http://h/?a=1&b=2'),
+])
+def test_same_request(a, b):
+    assert normalize_url(a) == normalize_url(b)
+
+@pytest.mark.parametrize('a, b', [
+    ('http://h/?id=1&id=2', 'http://h/?id=2&id=1'),
+    ('http://h/?a', 'http://h/?a='),
+    ('http://h/?q=%2B', 'http://h/?q=+'),
+    ('http://h/?q=a+b', 'http://h/?q=a%20b'),
+    ('http://h/?file=..%2F..%2Fetc%2Fpasswd', 'http://h/?file=../../etc/passwd'),
+    ('http://h/?q=%3Cx%3E', 'http://h/?q=%3cx%3e'),
+    ('http://h/?q=%27', "http://h/?q='"),
+    ('http://h:8080/p', 'http://h/p'),
+    ('http://h/P', 'http://h/p'),
+    ('https://h/p', 'http://h/p'),
+])
+def test_different_request(a, b):
+    assert normalize_url(a) != normalize_url(b)
+
+def test_only_safe_methods_have_keys():
+    coalescer = RequestCoalescer()
+    assert coalescer.key('GET', 'http://h/', {}) is not None
+    assert coalescer.key('head', 'http://h/', {}) is not None
+    assert coalescer.key('POST', 'http://h/', {}) is None
+
+def test_options_are_part_of_the_key():
+    coalescer = RequestCoalescer()
+    key = coalescer.key('GET', 'http://h/#a', {'headers': {'X': '1'}, 'params': None})
+    assert key == coalescer.key('GET', 'http://h/#b', {'headers': {'X': '1'}})
+    assert key != coalescer.key('GET', 'http://h/', {'headers': {'X': '2'}})
+    assert key != coalescer.key('GET', 'http://h/', {'headers': {'X': '1'}, 'max_body': 10})
+
+def test_in_flight_request_is_joined():
+    coalescer = RequestCoalescer()
+    key = coalescer.key('GET', 'http://h/', {})
+    future, owner = coalescer.begin(key)
+    joined, joined_owner = coalescer.begin(key)
+    assert owner and not joined_owner and joined is future
+    coalescer.finish(key, future, 'response')
+    assert joined.result() == 'response'
+    assert coalescer.stats() == {'joined': 1, 'reused': 0}
+
+def test_completed_response_is_reused_within_the_window():
+    coalescer = RequestCoalescer(window=60)
+    key = coalescer.key('GET', 'http://h/', {})
+    future, _ = coalescer.begin(key)
+    coalescer.finish(key, future, 'response')
+    reused, owner = coalescer.begin(key)
+    assert not owner and reused.result() == 'response'
+    assert coalescer.stats() == {'joined': 0, 'reused': 1}
+
+def test_no_window_only_joins_in_flight_requests():
+    coalescer = RequestCoalescer(window=0)
+    key = coalescer.key('GET', 'http://h/', {})
+    future, _ = coalescer.begin(key)
+    coalescer.finish(key, future, 'response')
+    assert coalescer.begin(key)[1]
+
+def test_failures_are_shared_but_not_kept():
+    coalescer = RequestCoalescer(window=60)
+    key = coalescer.key('GET', 'http://h/', {})
+    future, _ = coalescer.begin(key)
+    joined, _ = coalescer.begin(key)
+    coalescer.finish(key, future, error=TimeoutError('slow'))
+    with pytest.raises(TimeoutError):
+        joined.result()
+    assert coalescer.begin(key)[1]
+
+def test_write_invalidates_completed_responses_of_its_host():
+    coalescer = RequestCoalescer(window=60)
+    key = coalescer.key('GET', 'http://h/page', {})
+    other = coalescer.key('GET', 'http://other/page', {})
+    for k in (key, other):
+        future, _ = coalescer.begin(k)
+        coalescer.finish(k, future, 'before')
+    coalescer.invalidate('GET', 'http://h/form')
+    assert not coalescer.begin(key)[1]
+    coalescer.invalidate('POST', 'http://H:80/form')
+    assert coalescer.begin(key)[1]
+    assert not coalescer.begin(other)[1]
+
+def test_write_detaches_requests_in_flight():
+    # A GET sent before a submission must neither be joined by a GET made
+    # after it nor be kept once it completes
+    coalescer = RequestCoalescer(window=60)
+    key = coalescer.key('GET', 'http://h/page', {})
+    stale, _ = coalescer.begin(key)
+    coalescer.invalidate('POST', 'http://h/form')
+    fresh, owner = coalescer.begin(key)
+    assert owner and fresh is not stale
+    coalescer.finish(key, stale, 'before')
+    assert stale.result() == 'before'
+    coalescer.finish(key, fresh, 'after')
+    reused, owner = coalescer.begin(key)
+    assert not owner and reused.result() == 'after'
@@ -0,0 +1,117 @@
+"""
+Document - Parse-once HTML document model shared by all scanners
+"""
+
+import hashlib
+import importlib.util
+import threading
+from collections import OrderedDict
+
+PARSERS = ['lxml', 'html.parser']
+
+_parser = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+_cache = OrderedDict()
+_cache_size = 64
+_lock = threading.Lock()
+
+class Form:
+    """A <form> with its resolved method, action and fillable inputs"""
+
+    __slots__ = ('tag', 'action', 'method', 'inputs')
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.action = tag.get('action', '')
+        self.method = tag.get('method', 'get').lower()
+        self.inputs = tag.find_all(['input', 'textarea'])
+
+class Document:
+    """An HTML page parsed once, with the indexes the scanners query.
+
+    A single walk over the tree collects inline scripts, script sources,
+    inline event handlers, forms with their inputs, links (<a> with an
+    href), element ids and every string attribute value, so reflection
+    checks are list scans instead of repeated find_all() traversals.
+    """
+
+    def __init__(self, html, parser=None):
+        from bs4 import BeautifulSoup
+        
+        self.html = html
+        self.soup = BeautifulSoup(html, parser or _parser)
+
+        self.inline_scripts = []
+        self.script_srcs = []
+        self.event_handlers = []
+        self.attribute_values = []
+        self.forms = []
+        self.links = []
+        self.ids = set()
+
+        for tag in self.soup.find_all(True):
+            if tag.name == 'script':
+                if tag.string:
+                    self.inline_scripts.append(tag.string)
+                if tag.get('src'):
+                    self.script_srcs.append(tag.get('src'))
+            elif tag.name == 'form':
+                self.forms.append(Form(tag))
+            elif tag.name == 'a' and 'href' in tag.attrs:
+                self.links.append(tag)
+
+            for attr, value in tag.attrs.items():
+                if attr.startswith('on'):
+                    self.event_handlers.append((tag.name, attr, value))
+                if isinstance(value, str):
+                    self.attribute_values.append((tag.name, attr, value))
+                    if attr == 'id':
+                        self.ids.add(value)
+
+    def script_containing(self, needle):
+        """Return the first inline script containing needle, or None"""
+        for script in self.inline_scripts:
+            if needle in script:
+                return script
+        return None
+
+    def attribute_containing(self, needle, handlers_only=False):
+        """Return (tag, attribute, value) of the first attribute containing needle, or None"""
+        for tag_name, attr, value in (self.event_handlers if handlers_only else self.attribute_values):
+            if isinstance(value, str) and needle in value:
+                return tag_name, attr, value
+        return None
+
+def parse_document(html):
+    """Return the shared Document for this HTML, parsing it only on first use.
+
+    Documents are cached by content hash, so scanners that receive the same
+    page (or identical probe responses) share a single parse.
+    """
+    key = hashlib.blake2b(html.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    with _lock:
+        document = _cache.get(key)
+        if document is not None:
+            _cache.move_to_end(key)
+            return document
+
+    document = Document(html)
+    with _lock:
+        _cache[key] = document
+        while len(_cache) > _cache_size:
+            _cache.popitem(last=False)
+    return document
+
+def set_parser(name):
+    """Select the BeautifulSoup backend; 'auto' prefers lxml when installed"""
+    global _parser
+    if name == 'auto':
+        name = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+    elif name == 'lxml' and not importlib.util.find_spec('lxml'):
+        raise ValueError("The lxml parser is not installed (pip install lxml)")
+    with _lock:
+        _parser = name
+        _cache.clear()
+    return name
+
+def get_parser():
+    return _parser
@@ -0,0 +1,142 @@
+"""
+Findings - Structured scan results with an explicit severity
+"""
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+_sink = None
+
+class Severity(IntEnum):
+    INFO = 0
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+
+    @property
+    def label(self):
+        return self.name.lower()
+
+@dataclass(frozen=True, slots=True)
+class Finding:
+    """One scanner result.
+
+    INFO findings carry status messages ("nothing found", errors) and are not
+    counted as issues. fingerprint identifies the same issue across runs and
+    targets' reports: scanner, target, parameter and payload.
+    """
+
+    scanner: str
+    target: str
+    severity: Severity
+    message: str
+    parameter: str = None
+    payload: str = None
+    evidence: str = None
+    evidence_offset: int = -1
+    fingerprint: str = field(default='', compare=False)
+
+    def __post_init__(self):
+        if not self.fingerprint:
+            object.__setattr__(self, 'fingerprint', fingerprint(self.scanner, self.target, self.parameter, self.payload))
+
+    @property
+    def is_issue(self):
+        return self.severity > Severity.INFO
+
+    def to_dict(self):
+        return {
+            'scanner': self.scanner,
+            'target': self.target,
+            'severity': self.severity.label,
+            'message': self.message,
+            'parameter': self.parameter,
+            'payload': self.payload,
+            'evidence': self.evidence,
+            'evidence_offset': self.evidence_offset,
+            'fingerprint': self.fingerprint
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data['severity'] = Severity[data['severity'].upper()]
+        return cls(**data)
+
+    def __str__(self):
+        return self.message
+
+def fingerprint(scanner, target, parameter=None, payload=None):
+    """Stable id of a scanner probe: the same inputs give the same fingerprint"""
+    key = '\x1f'.join(str(part) for part in (scanner, target, parameter, payload))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+def to_serializable(results):
+    """Convert the Findings in a {scan_type: results} dict to plain dicts"""
+    return {
+        scan_type: [item.to_dict() if isinstance(item, Finding) else item for item in scan_results]
+        if isinstance(scan_results, list) else scan_results
+        for scan_type, scan_results in results.items()
+    }
+
+class JSONLSink:
+    """Appends findings to a JSON Lines file as soon as they are produced.
+
+    Each finding is one line, flushed to the OS right after it is written,
+    so an interrupted scan keeps everything found up to that point. The
+    write buffer is capped at buffer_size bytes and nothing else is held
+    in memory, however many targets are scanned.
+    """
+
+    def __init__(self, path, buffer_size=65536):
+        self.path = path
+        self.written = 0
+        self._file = open(path, 'a', encoding='utf-8', buffering=buffer_size)
+        self._lock = threading.Lock()
+
+    def write(self, finding):
+        line = json.dumps(finding.to_dict()) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.written += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_jsonl(path):
+    """Yield the Findings stored in a JSONL file written by JSONLSink.
+
+    A truncated last line (the scan was killed mid-write) is skipped.
+    """
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield Finding.from_dict(json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                continue
+
+def set_sink(sink):
+    """Route every finding the built-in scanners produce to sink (None to stop)"""
+    global _sink
+    _sink = sink
+
+def emit(finding):
+    sink = _sink
+    if sink is not None:
+        sink.write(finding)
+    return finding
@@ -0,0 +1,410 @@
+"""
+HTTP Client - Shared pooled HTTP transport for all scanner modules
+"""
+
+import asyncio
+import importlib.util
+import json
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from utils.rate_limiter import HostRateLimiter
+from utils.request_coalescer import RequestCoalescer
+from utils.response_cache import ResponseCache
+
+class HTTPClient:
+    """Keep-alive HTTP transport shared by every scanner and plugin.
+
+    Connections are pooled per host, so consecutive payload requests against
+    the same target reuse one TCP/TLS connection instead of paying a fresh
+    handshake each time. request() is blocking (requests); arequest() is the
+    non-blocking equivalent (aiohttp) used by the asyncio engine, sharing the
+    same headers, timeouts, pool sizes and statistics.
+
+    When a rate is configured, every request first books a slot with the
+    shared per-host HostRateLimiter and reports its outcome back to it.
+    Requests made with cache=True (baseline page fetches) are answered from
+    the shared ResponseCache when possible, so a page several scanners
+    start from is downloaded once per scan.
+    
+    Every request also goes through the RequestCoalescer: a GET identical
+    to one in flight or completed in the last coalesce_window seconds (the
+    URL fragment and query parameter order aside, so fragment-only DOM
+    payloads included) gets that request's response instead of a network
+    call of its own.
+    
+    With max_body set (or stop_at passed), the body is streamed in chunks
+    instead: reading stops after max_body bytes, after the timeout, or as
+    soon as the stop_at PatternMatcher finds a signature in the raw bytes,
+    and the connection is released right away. request() still returns a
+    requests.Response, holding the body read so far, and arequest() an
+    HTTPResponse; on both, a truncated flag tells whether the body was cut
+    short, and text is decoded with the charset from the headers (UTF-8 if
+    none) rather than sniffed.
+    """
+
+    CHUNK_SIZE = 16384
+
+    DEFAULT_HEADERS = {
+        'User-Agent': 'CyberNexus/1.0 Security Scanner',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1'
+    }
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, timeout=10, headers=None,
+                 rate=None, burst=1, cache_size=256, cache_ttl=300, max_body=None, coalesce_window=10):
+        self.timeout = timeout
+        self.max_body = max_body or None
+        self.rate_limiter = HostRateLimiter(rate, burst) if rate else None
+        self.response_cache = ResponseCache(cache_size, cache_ttl) if cache_size else None
+        self.coalescer = RequestCoalescer(coalesce_window)
+        self.session = requests.Session()
+        self.session.headers.update(self.DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._connections = 0
+        self._async_sessions = {}
+        self.configure(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+
+    def configure(self, pool_connections=None, pool_maxsize=None, timeout=None, rate=None, burst=1,
+                  cache_size=None, cache_ttl=None, max_body=None, coalesce_window=None):
+        """Resize the connection pools, change the default timeout, the per-host rate, the cache,
+        the body cap or the coalescing window.
+
+        rate is in requests per second per host; pass 0 to disable rate limiting.
+        A cache_size of 0 disables the response cache, a max_body of 0 the body cap,
+        and a coalesce_window of 0 limits coalescing to requests still in flight.
+        """
+        if coalesce_window is not None:
+            self.coalescer = RequestCoalescer(coalesce_window)
+        if timeout is not None:
+            self.timeout = timeout
+        if max_body is not None:
+            self.max_body = max_body or None
+        if rate is not None:
+            self.rate_limiter = HostRateLimiter(rate, burst) if rate > 0 else None
+        if cache_size is not None or cache_ttl is not None:
+            current = self.response_cache
+            cache_size = cache_size if cache_size is not None else (current.maxsize if current else 256)
+            cache_ttl = cache_ttl if cache_ttl is not None else (current.ttl if current else 300)
+            self.response_cache = ResponseCache(cache_size, cache_ttl) if cache_size else None
+        if pool_connections is None and pool_maxsize is None:
+            return
+
+        self.pool_connections = pool_connections or getattr(self, 'pool_connections', 10)
+        self.pool_maxsize = pool_maxsize or getattr(self, 'pool_maxsize', 10)
+        adapter = _CountingAdapter(self._record_connection,
+                                   pool_connections=self.pool_connections,
+                                   pool_maxsize=self.pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method, url, cache=False, stop_at=None, max_body=None, **kwargs):
+        key = self._cache_key(cache, method, url, kwargs.get('params'), kwargs.get('data'))
+        if key is not None:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached
+
+        options = dict(kwargs, stop_at=stop_at, max_body=max_body)
+        options.pop('timeout', None)
+        coalesced = self.coalescer.key(method, url, options)
+        if coalesced is None:
+            self.coalescer.invalidate(method, url)
+            try:
+                return self._send(method, url, key, stop_at, max_body, kwargs)
+            finally:
+                self.coalescer.invalidate(method, url)
+        future, owner = self.coalescer.begin(coalesced)
+        if not owner:
+            return future.result()
+        try:
+            response = self._send(method, url, key, stop_at, max_body, kwargs)
+        except BaseException as e:
+            self.coalescer.finish(coalesced, future, error=e)
+            raise
+        self.coalescer.finish(coalesced, future, response)
+        return response
+
+    def _send(self, method, url, key, stop_at, max_body, kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        if self.rate_limiter:
+            time.sleep(self.rate_limiter.reserve(url))
+        with self._lock:
+            self._requests += 1
+
+        started = time.monotonic()
+        max_body = max_body if max_body is not None else self.max_body
+        try:
+            if stop_at is not None or max_body:
+                response = self._streamed_request(method, url, stop_at, max_body, started, kwargs)
+            else:
+                response = self.session.request(method, url, **kwargs)
+        except Exception:
+            self._record_outcome(url, None, time.monotonic() - started)
+            raise
+        # elapsed stops at the headers: a long body download is not congestion
+        self._record_outcome(url, response, response.elapsed.total_seconds())
+        if key is not None:
+            self.response_cache.put(key, response)
+        return response
+
+    async def arequest(self, method, url, params=None, data=None, headers=None,
+                       timeout=None, allow_redirects=True, cache=False, stop_at=None, max_body=None):
+        """Non-blocking request; returns an HTTPResponse with the body already read"""
+        key = self._cache_key(cache, method, url, params, data)
+        if key is not None:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached
+
+        options = {'params': params, 'data': data, 'headers': headers, 'allow_redirects': allow_redirects,
+                   'stop_at': stop_at, 'max_body': max_body}
+        coalesced = self.coalescer.key(method, url, options)
+        if coalesced is None:
+            self.coalescer.invalidate(method, url)
+            try:
+                return await self._asend(method, url, key, params, data, headers, timeout, allow_redirects,
+                                         stop_at, max_body)
+            finally:
+                self.coalescer.invalidate(method, url)
+        future, owner = self.coalescer.begin(coalesced)
+        if not owner:
+            # Shielded: a waiter being cancelled must not cancel the shared request
+            return await asyncio.shield(asyncio.wrap_future(future))
+        try:
+            result = await self._asend(method, url, key, params, data, headers, timeout, allow_redirects,
+                                       stop_at, max_body)
+        except BaseException as e:
+            self.coalescer.finish(coalesced, future, error=e)
+            raise
+        self.coalescer.finish(coalesced, future, result)
+        return result
+
+    async def _asend(self, method, url, key, params, data, headers, timeout, allow_redirects, stop_at, max_body):
+        import aiohttp
+
+        session = self._async_session()
+        if self.rate_limiter:
+            await asyncio.sleep(self.rate_limiter.reserve(url))
+        with self._lock:
+            self._requests += 1
+
+        started = time.monotonic()
+        client_timeout = aiohttp.ClientTimeout(total=timeout if timeout is not None else self.timeout)
+        max_body = max_body if max_body is not None else self.max_body
+        try:
+            async with session.request(method, url, params=params, data=data, headers=headers,
+                                       timeout=client_timeout, allow_redirects=allow_redirects) as response:
+                latency = time.monotonic() - started
+                if stop_at is not None or max_body:
+                    reader = _BodyReader(stop_at, max_body)
+                    async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                        if reader.feed(chunk):
+                            break
+                    # Leaving the block with the body unread closes the connection
+                    body, truncated = reader.body(), reader.stopped
+                else:
+                    body, truncated = await response.read(), False
+                result = HTTPResponse(str(response.url), response.status, response.headers,
+                                      body, response.charset, truncated)
+        except Exception:
+            self._record_outcome(url, None, time.monotonic() - started)
+            raise
+        self._record_outcome(url, result, latency)
+        if key is not None:
+            self.response_cache.put(key, result)
+        return result
+
+    def _streamed_request(self, method, url, stop_at, max_body, started, kwargs):
+        timeout = kwargs['timeout']
+        deadline = started + timeout if isinstance(timeout, (int, float)) else None
+        reader = _BodyReader(stop_at, max_body)
+        with self.session.request(method, url, stream=True, **kwargs) as response:
+            for chunk in response.iter_content(self.CHUNK_SIZE):
+                if reader.feed(chunk) or (deadline is not None and time.monotonic() > deadline):
+                    reader.stopped = True
+                    break
+            # Closing a response with its body unread drops the connection
+            # instead of waiting for the rest of it
+        # The body read so far becomes the response's content, so callers
+        # get the whole requests.Response API either way
+        response._content = reader.body()
+        response._content_consumed = True
+        response.truncated = reader.stopped
+        if response.encoding is None:
+            response.encoding = 'utf-8'
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        """Return request and connection reuse counters"""
+        with self._lock:
+            requests_sent = self._requests
+            opened = self._connections
+        reused = max(0, requests_sent - opened)
+        stats = {
+            'requests': requests_sent,
+            'connections_opened': opened,
+            'connections_reused': reused,
+            'reuse_ratio': round(reused / requests_sent, 3) if requests_sent else 0.0
+        }
+        if self.rate_limiter:
+            stats['rate_limit'] = self.rate_limiter.stats()
+        if self.response_cache:
+            stats['response_cache'] = self.response_cache.stats()
+        stats['coalesced'] = self.coalescer.stats()
+        return stats
+
+    def close(self):
+        self.session.close()
+
+    async def aclose(self):
+        """Close the aiohttp session bound to the running event loop"""
+        session = self._async_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    @staticmethod
+    def async_available():
+        return importlib.util.find_spec('aiohttp') is not None
+
+    def _async_session(self):
+        # aiohttp sessions are bound to the loop they were created on
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            import aiohttp
+
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._on_async_connection)
+            connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.pool_maxsize)
+            session = aiohttp.ClientSession(connector=connector, headers=dict(self.session.headers),
+                                            trace_configs=[trace])
+            self._async_sessions[loop] = session
+        return session
+
+    def _cache_key(self, cache, method, url, params, data):
+        if not cache or not self.response_cache:
+            return None
+        return ResponseCache.make_key(method, url, params, data)
+
+    def _record_outcome(self, url, response, latency):
+        if not self.rate_limiter:
+            return
+        if response is None:
+            self.rate_limiter.record(url, None, latency)
+        else:
+            self.rate_limiter.record(url, response.status_code, latency,
+                                     retry_after=response.headers.get('Retry-After'))
+
+    async def _on_async_connection(self, session, context, params):
+        self._record_connection()
+
+    def _record_connection(self):
+        with self._lock:
+            self._connections += 1
+
+class HTTPResponse:
+    """Read response returned by HTTPClient.arequest().
+
+    truncated is set when reading stopped before the end of the body (the
+    body cap, the timeout or a stop_at signature was reached).
+    """
+
+    def __init__(self, url, status_code, headers, content, encoding=None, truncated=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.truncated = truncated
+        self._text = None
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = self.content.decode(self.encoding or 'utf-8', errors='replace')
+        return self._text
+
+    def json(self):
+        return json.loads(self.text)
+
+class _BodyReader:
+    """Collects a streamed body until max_body bytes or the first stop_at match"""
+
+    def __init__(self, stop_at=None, max_body=None):
+        self.stop_at = stop_at
+        self.max_body = max_body
+        self.stopped = False
+        self._chunks = []
+        self._size = 0
+        self._tail = b''
+
+    def feed(self, chunk):
+        """Add a chunk; returns True once reading should stop"""
+        if self.max_body and self._size + len(chunk) > self.max_body:
+            chunk = chunk[:self.max_body - self._size]
+            self.stopped = True
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        if self.stop_at is not None:
+            window = self._tail + chunk
+            if self.stop_at.found(window):
+                self.stopped = True
+            elif self.stop_at.longest > 1:
+                self._tail = window[-(self.stop_at.longest - 1):]
+        return self.stopped
+
+    def body(self):
+        return b''.join(self._chunks)
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report every connection they open,
+    including a dropped keep-alive connection being reopened in place"""
+
+    def __init__(self, on_new_connection, **kwargs):
+        self._on_new_connection = on_new_connection
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool(HTTPConnectionPool, self._on_new_connection),
+            'https': _counting_pool(HTTPSConnectionPool, self._on_new_connection)
+        }
+
+def _counting_pool(base, on_new_connection):
+    # Counted in connect(), not when the pool creates a connection object:
+    # urllib3 reconnects a closed connection on the same object
+    class CountingConnection(base.ConnectionCls):
+        def connect(self):
+            super().connect()
+            on_new_connection()
+
+    class CountingConnectionPool(base):
+        ConnectionCls = CountingConnection
+
+    # Named after urllib3's classes, which errors and reprs print
+    for counting, original in ((CountingConnection, base.ConnectionCls), (CountingConnectionPool, base)):
+        counting.__name__ = original.__name__
+        counting.__qualname__ = original.__qualname__
+        counting.__module__ = original.__module__
+    return CountingConnectionPool
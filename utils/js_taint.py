@@ -0,0 +1,277 @@
+"""
+JS Taint - Lightweight static source-to-sink analysis of JavaScript for DOM XSS
+"""
+
+import re
+from collections import namedtuple
+
+from utils.sink_matcher import sink_matcher_for
+
+# Bumped whenever the analysis changes, so cached results are recomputed
+ANALYSIS_VERSION = 2
+
+# Attacker-controllable values, and the payload contexts that reach them
+SOURCES = {
+    'location.hash': ('fragment',),
+    'location.search': ('query',),
+    'location.href': ('fragment', 'query'),
+    'document.URL': ('fragment', 'query'),
+    'document.documentURI': ('fragment', 'query'),
+    'document.referrer': (),
+    'window.name': ()
+}
+# Properties that parse what is assigned to them as HTML
+PROPERTY_SINKS = ('innerHTML', 'outerHTML')
+# Functions that run or write their arguments as code or HTML
+CALL_SINKS = ('eval', 'Function', 'setTimeout', 'setInterval', 'document.write', 'document.writeln',
+              'insertAdjacentHTML', 'html')
+# Calls whose result no longer carries the taint of their arguments
+SANITIZERS = ('encodeURIComponent', 'encodeURI', 'escape', 'parseInt', 'parseFloat', 'Number',
+              'DOMPurify.sanitize')
+
+# source: the source read; sink: the sink it reaches; offset, line, column:
+# where the sink is in the script (1-based line and column)
+TaintFlow = namedtuple('TaintFlow', 'source sink offset line column')
+
+# One token, after any whitespace and comments; end matches after trailing
+# ones, which would otherwise be backtracked into and read as code
+_TOKEN = re.compile(r"""
+    (?:\s+|//[^\n]*|/\*[\s\S]*?(?:\*/|$))*
+    (?:
+      (?P<name>[A-Za-z_$][\w$]*(?:\s*\??\.\s*[A-Za-z_$][\w$]*)*)
+    | (?P<number>\d[\w.]*|\.\d\w*)
+    | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+    | (?P<template>`(?:[^`\\]|\\.)*`)
+    | (?P<punct>>>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|>>>|=>|==|!=|<=|>=|&&|\|\||\?\?|\?\.|\+\+|--|[-+*/%&|^]=|<<|>>|\*\*|[^\s\w$])
+    | (?P<end>\Z)
+    )
+""", re.VERBOSE)
+# A regular expression literal, from its opening /
+REGEX_LITERAL = re.compile(r"/(?:[^/\\\n\[]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+_CHAIN_SPACE = re.compile(r'[\s?]')
+_INTERPOLATION = re.compile(r'\$\{([^}]*)\}')
+# After these a / starts a regular expression, not a division
+_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void',
+                   'throw', 'instanceof', 'yield', 'await'}
+_OPENERS = {'(': ')', '[': ']', '{': '}'}
+# Only the flows seen in this many passes over the assignments are followed
+_ROUNDS = 4
+
+class Tokens:
+    """Tokens of a script as parallel lists of kinds, texts and offsets"""
+
+    __slots__ = ('kinds', 'texts', 'offsets')
+
+    def __init__(self):
+        self.kinds, self.texts, self.offsets = [], [], []
+
+    def __len__(self):
+        return len(self.kinds)
+
+def tokenize(js):
+    """Tokens of js, without whitespace and comments.
+
+    Member chains (window.location.hash, a?.b) are one 'name' token with
+    the spaces and ?s removed; a name right after a '.' token (the member
+    of a call result, as in $(x).html) gets a leading dot. Regular
+    expression literals are told from divisions by the token before them.
+    """
+    tokens = Tokens()
+    kinds, texts, offsets = tokens.kinds, tokens.texts, tokens.offsets
+    position = 0
+    while position is not None:
+        matches, position = _TOKEN.finditer(js, position), None
+        for match in matches:
+            kind = match.lastgroup
+            if kind == 'end':
+                break
+            text, offset = match.group(kind), match.start(kind)
+            if kind == 'name':
+                if ' ' in text or '?' in text or '\n' in text or '\t' in text:
+                    text = _CHAIN_SPACE.sub('', text)
+                if texts and texts[-1] in ('.', '?.'):
+                    text = '.' + text
+            elif kind == 'punct' and text in ('/', '/=') and starts_regex(kinds[-1] if kinds else None,
+                                                                          texts[-1] if texts else None):
+                regex = REGEX_LITERAL.match(js, offset)
+                if regex is not None:
+                    # The tokens after a regular expression are matched anew
+                    # from its end
+                    kinds.append('regex')
+                    texts.append(regex.group())
+                    offsets.append(offset)
+                    position = regex.end()
+                    break
+            kinds.append(kind)
+            texts.append(text)
+            offsets.append(offset)
+    return tokens
+
+def starts_regex(kind, text):
+    """Whether a / after a token of this kind and text (kind None at the
+    start of a script) starts a regular expression rather than a division"""
+    if kind is None:
+        return True
+    if kind in ('number', 'string', 'template', 'regex'):
+        return False
+    if kind == 'name':
+        return text in _REGEX_KEYWORDS
+    return text not in (')', ']')
+
+def analyze(js):
+    """TaintFlows from SOURCES to sinks in js, in order of sink offset.
+
+    The analysis is deliberately simple: a variable is tainted when any
+    assignment to it reads a source or a tainted variable (by name, across
+    all scopes and in any order), and a flow is reported where a tainted
+    value is assigned to an HTML property or passed to a sink function,
+    unless it went through a sanitizing call first. Taint does not follow
+    function parameters, object properties or return values.
+    """
+    # Nothing to follow in scripts that never read a source
+    if next(sink_matcher_for(tuple(SOURCES)).finditer(js), None) is None:
+        return []
+
+    tokens = tokenize(js)
+    kinds, texts, offsets = tokens.kinds, tokens.texts, tokens.offsets
+    partners = _partners(tokens)
+    # Assignments to plain variables, and the sinks with the tokens of the
+    # value they receive
+    assignments, sinks = [], []
+    last = len(kinds) - 1
+    for index, kind in enumerate(kinds):
+        if kind != 'name' or index == last:
+            continue
+        following, chain = texts[index + 1], texts[index]
+        if following in ('=', '+='):
+            if '.' not in chain:
+                assignments.append((chain, index + 2, _expression_end(tokens, partners, index + 2)))
+            else:
+                sink = _member(chain, _PROPERTY_SINKS)
+                if sink is not None:
+                    sinks.append((offsets[index], sink, index + 2, _expression_end(tokens, partners, index + 2)))
+        elif following == '(' and index + 1 in partners:
+            sink = _member(chain, _CALL_SINKS)
+            if sink is not None:
+                sinks.append((offsets[index], sink, index + 2, partners[index + 1]))
+    if not sinks:
+        return []
+
+    tainted = {}
+    for _ in range(_ROUNDS):
+        changed = False
+        for name, start, end in assignments:
+            if name not in tainted:
+                source = _tainted_by(tokens, partners, start, end, tainted)
+                if source is not None:
+                    tainted[name] = source
+                    changed = True
+        if not changed:
+            break
+
+    flows = []
+    for offset, sink, start, end in sorted(sinks):
+        source = _tainted_by(tokens, partners, start, end, tainted)
+        if source is not None:
+            flows.append(TaintFlow(source, sink, offset, *_line_column(js, offset)))
+    return flows
+
+def _partners(tokens):
+    # index of each opening bracket -> index of its closing bracket
+    partners, stack = {}, []
+    kinds, texts = tokens.kinds, tokens.texts
+    for index, kind in enumerate(kinds):
+        if kind != 'punct':
+            continue
+        text = texts[index]
+        if text in _OPENERS:
+            stack.append(index)
+        elif text in (')', ']', '}'):
+            while stack and _OPENERS[texts[stack[-1]]] != text:
+                stack.pop()
+            if stack:
+                partners[stack.pop()] = index
+    return partners
+
+def _expression_end(tokens, partners, start):
+    # End (exclusive) of the expression starting at start: the first
+    # ; or , or unmatched closing bracket outside of nested brackets
+    kinds, texts = tokens.kinds, tokens.texts
+    index, end = start, len(kinds)
+    while index < end:
+        if kinds[index] == 'punct':
+            text = texts[index]
+            if text in (';', ',', ')', ']', '}'):
+                break
+            if text in _OPENERS:
+                if index not in partners:
+                    break
+                index = partners[index]
+        index += 1
+    return index
+
+def _tainted_by(tokens, partners, start, end, tainted):
+    # Source whose value reaches the tokens start..end, or None. Braces are
+    # skipped: a function body or object literal does not make the value
+    # itself tainted, and taint is not followed into properties.
+    kinds, texts = tokens.kinds, tokens.texts
+    index = start
+    while index < end:
+        kind = kinds[index]
+        if kind == 'name':
+            text = texts[index]
+            if text.lstrip('.') in SANITIZERS and index + 1 in partners and texts[index + 1] == '(':
+                index = partners[index + 1] + 1
+                continue
+            source = _source(text, tainted)
+            if source is not None:
+                return source
+        elif kind == 'punct':
+            if texts[index] == '{' and index in partners:
+                index = partners[index]
+        elif kind == 'template' and '${' in texts[index]:
+            for expression in _INTERPOLATION.findall(texts[index]):
+                inner = tokenize(expression)
+                source = _tainted_by(inner, _partners(inner), 0, len(inner), tainted)
+                if source is not None:
+                    return source
+        index += 1
+    return None
+
+def _source(chain, tainted):
+    # Source read by a member chain: a source itself (window.location.hash,
+    # location.search.slice) or a variable, or member of a variable, that
+    # is tainted
+    if '.' not in chain:
+        return tainted.get(chain)
+    segments = chain.split('.')
+    for pair in zip(segments, segments[1:]):
+        if pair in _SOURCE_PAIRS:
+            return _SOURCE_PAIRS[pair]
+    return tainted.get(segments[0]) if segments[0] else None
+
+def _member(chain, names):
+    # The name in names (grouped by last segment) that chain ends with, as a whole member
+    for name in names.get(chain[chain.rfind('.') + 1:], ()):
+        if chain == name or chain.endswith('.' + name):
+            return name
+    return None
+
+def _by_last_segment(names):
+    grouped = {}
+    for name in names:
+        grouped.setdefault(name.split('.')[-1], []).append(name)
+    return grouped
+
+_SOURCE_PAIRS = {tuple(source.split('.')): source for source in SOURCES}
+_PROPERTY_SINKS = _by_last_segment(PROPERTY_SINKS)
+_CALL_SINKS = _by_last_segment(CALL_SINKS)
+
+def _line_column(js, offset):
+    line_start = js.rfind('\n', 0, offset) + 1
+    return js.count('\n', 0, offset) + 1, offset - line_start + 1
+
+def contexts(flows):
+    """Payload contexts (URL parts) that reach the given flows, fragment first"""
+    reached = {context for flow in flows for context in SOURCES.get(flow.source, ())}
+    return [context for context in ('fragment', 'query') if context in reached]
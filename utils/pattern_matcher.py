@@ -0,0 +1,53 @@
+"""
+Pattern Matcher - Finds many literal patterns in one pass over a response body
+"""
+
+import functools
+import re
+
+class PatternMatcher:
+    """Multi-pattern search for a fixed set of literal strings.
+
+    All patterns are compiled into one alternation, searched for in a
+    single pass by the re engine, which skips ahead to bytes that can start
+    a pattern. The same matcher runs over raw response bytes (no decoding,
+    to rule a body out cheaply) and over decoded text (to get offsets for
+    the context lexer). Where patterns overlap at one position the longest
+    wins; matches do not overlap each other. With ignore_case, ASCII letters
+    match either case.
+
+    longest is the length of the longest pattern in bytes: a match split
+    across two chunks of a stream is found by searching each chunk together
+    with the last longest - 1 bytes of the one before.
+    """
+
+    def __init__(self, patterns, ignore_case=False):
+        self.patterns = list(dict.fromkeys(patterns))
+        self.longest = max(len(pattern.encode('utf-8')) for pattern in self.patterns)
+        # A single literal is faster to find with str/bytes.find()
+        self._single = self.patterns[0] if len(self.patterns) == 1 and not ignore_case else None
+        self._single_bytes = self._single.encode('utf-8') if self._single is not None else None
+        alternation = '|'.join(re.escape(pattern) for pattern in sorted(self.patterns, key=len, reverse=True))
+        flags = re.IGNORECASE if ignore_case else 0
+        self._text = re.compile(alternation, flags)
+        self._bytes = re.compile(alternation.encode('utf-8'), flags)
+
+    def found(self, data):
+        """Whether any pattern occurs in data (str or bytes)"""
+        if self._single is not None:
+            return (self._single_bytes if isinstance(data, bytes) else self._single) in data
+        return (self._bytes if isinstance(data, bytes) else self._text).search(data) is not None
+
+    def finditer(self, data):
+        """Yield (offset, pattern) for each occurrence in data (str or bytes)"""
+        if isinstance(data, bytes):
+            for match in self._bytes.finditer(data):
+                yield match.start(), match.group(0).decode('utf-8')
+        else:
+            for match in self._text.finditer(data):
+                yield match.start(), match.group(0)
+
+@functools.lru_cache(maxsize=256)
+def matcher_for(patterns, ignore_case=False):
+    """Shared PatternMatcher for a tuple of patterns, compiled once"""
+    return PatternMatcher(patterns, ignore_case)
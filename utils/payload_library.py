@@ -0,0 +1,149 @@
+"""
+Payload Library - Indexed payload corpus, loaded from disk the first time it is queried
+"""
+
+import json
+import os
+import threading
+from collections import namedtuple
+
+# Built-in corpus shipped with CyberNexus
+PAYLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'payloads')
+
+# value: the payload (a template where the scanner fills in placeholders)
+# contexts: where the payload is meant to land (reflection context, URL part, ...)
+# encoding: how the payload is encoded or obfuscated ('none', 'url', 'base64', ...)
+# techs: target technologies it is specific to; empty means any
+# cost: relative expense of trying it (1 = cheap and generic); cheaper first
+Payload = namedtuple('Payload', 'value contexts encoding techs cost')
+
+_library = None
+
+class PayloadLibrary:
+    """Payload corpus stored as one JSON Lines file per family.
+
+    A family (e.g. 'xss', 'lfi') is the file <family>.jsonl in any of the
+    corpus directories; each line is one payload:
+
+        {"payload": "...", "contexts": ["html"], "encoding": "none",
+         "tech": ["php"], "cost": 1}
+
+    Nothing is read until a family is first queried. Files are merged in
+    directory order and payloads are deduplicated by value: a payload seen
+    again adds its contexts and techs to the first entry and keeps the lower
+    cost. Each family is indexed by context, encoding and tech, and query
+    results are cached, so scanners can query per parameter cheaply.
+    """
+
+    def __init__(self, directories=None):
+        self.directories = list(directories) if directories else [PAYLOAD_DIR]
+        self._families = {}
+        self._queries = {}
+        self._lock = threading.Lock()
+
+    def add_directory(self, directory):
+        """Also load corpus files from directory (takes effect for families not yet loaded)"""
+        with self._lock:
+            self.directories.append(directory)
+
+    def query(self, family, context=None, encoding=None, tech=None, max_cost=None):
+        """Payload values of family matching every given criterion, cheapest first.
+
+        tech may be one technology or several; payloads specific to other
+        technologies are left out, generic ones are always included.
+        """
+        techs = frozenset([tech] if isinstance(tech, str) else tech or ())
+        key = (family, context, encoding, techs, max_cost)
+        with self._lock:
+            if key not in self._queries:
+                index = self._family(family)
+                self._queries[key] = tuple(payload.value for payload in index.select(context, encoding, techs, max_cost))
+            return list(self._queries[key])
+
+    def payloads(self, family):
+        """All Payload entries of family, in corpus order"""
+        with self._lock:
+            return list(self._family(family).payloads)
+
+    def _family(self, family):
+        index = self._families.get(family)
+        if index is None:
+            paths = [os.path.join(directory, f"{family}.jsonl") for directory in self.directories]
+            paths = [path for path in paths if os.path.isfile(path)]
+            if not paths:
+                raise FileNotFoundError(f"Payload family '{family}' not found.")
+            index = self._families[family] = _FamilyIndex(paths)
+        return index
+
+class _FamilyIndex:
+    """Deduplicated payloads of one family with their lookup indexes"""
+
+    def __init__(self, paths):
+        entries = {}
+        for path in paths:
+            for entry in _read_entries(path):
+                value = entry['payload']
+                contexts = frozenset(entry.get('contexts', ()))
+                techs = frozenset(entry.get('tech', ()))
+                cost = int(entry.get('cost', 1))
+                previous = entries.get(value)
+                if previous is None:
+                    entries[value] = Payload(value, contexts, entry.get('encoding', 'none'), techs, cost)
+                else:
+                    entries[value] = previous._replace(contexts=previous.contexts | contexts,
+                                                       techs=previous.techs | techs if previous.techs and techs else frozenset(),
+                                                       cost=min(previous.cost, cost))
+
+        self.payloads = list(entries.values())
+        self.by_context, self.by_encoding = {}, {}
+        for position, payload in enumerate(self.payloads):
+            for context in payload.contexts:
+                self.by_context.setdefault(context, []).append(position)
+            self.by_encoding.setdefault(payload.encoding, []).append(position)
+
+    def select(self, context, encoding, techs, max_cost):
+        if context is not None:
+            positions = self.by_context.get(context, [])
+        elif encoding is not None:
+            positions = self.by_encoding.get(encoding, [])
+        else:
+            positions = range(len(self.payloads))
+
+        selected = []
+        for position in positions:
+            payload = self.payloads[position]
+            if encoding is not None and payload.encoding != encoding:
+                continue
+            if techs and payload.techs and not payload.techs & techs:
+                continue
+            if max_cost is not None and payload.cost > max_cost:
+                continue
+            selected.append((payload.cost, position, payload))
+        selected.sort(key=lambda item: item[:2])
+        return [payload for _, _, payload in selected]
+
+def _read_entries(path):
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+                if not isinstance(entry, dict) or not isinstance(entry.get('payload'), str):
+                    raise ValueError("missing 'payload'")
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: invalid payload entry ({e})") from None
+            yield entry
+
+def set_library(library):
+    """Make library the one scanners take their payloads from"""
+    global _library
+    _library = library
+
+def get_library():
+    """The shared PayloadLibrary, reading the built-in corpus unless set_library() was called"""
+    global _library
+    if _library is None:
+        _library = PayloadLibrary()
+    return _library
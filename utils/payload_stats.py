@@ -0,0 +1,130 @@
+"""
+Payload Stats - Per-server payload hit rates kept across runs, for trying likely payloads first
+"""
+
+import sqlite3
+import threading
+
+_stats = None
+
+# Response headers / cookies that give away a WAF or CDN in front of the target
+WAF_HEADERS = {
+    'cf-ray': 'cloudflare',
+    'x-sucuri-id': 'sucuri',
+    'x-iinfo': 'imperva',
+    'x-amz-cf-id': 'cloudfront',
+    'x-akamai-transformed': 'akamai',
+    'x-azure-ref': 'azure-frontdoor',
+    'x-cdn': 'cdn'
+}
+WAF_COOKIES = {
+    '__cf_bm': 'cloudflare',
+    'incap_ses': 'imperva',
+    'visid_incap': 'imperva',
+    'bigipserver': 'f5-bigip',
+    'aws-waf-token': 'aws-waf',
+    'ts01': 'f5-asm'
+}
+
+def server_fingerprint(response):
+    """Coarse "server|powered-by|waf" label of the stack behind a response.
+
+    Versions are dropped so that stats carry over between patch releases;
+    parts that cannot be told from the headers are '-'.
+    """
+    headers = response.headers
+    server = _product(headers.get('Server', ''))
+    powered_by = _product(headers.get('X-Powered-By', ''))
+
+    waf = '-'
+    lowered = {name.lower() for name in headers.keys()}
+    cookies = headers.get('Set-Cookie', '').lower()
+    for header, name in WAF_HEADERS.items():
+        if header in lowered:
+            waf = name
+            break
+    else:
+        for cookie, name in WAF_COOKIES.items():
+            if cookie in cookies:
+                waf = name
+                break
+    if waf == '-' and server in ('cloudflare', 'akamaighost', 'sucuri/cloudproxy'):
+        waf = server
+    return f"{server}|{powered_by}|{waf}"
+
+def _product(value):
+    token = value.strip().split(' ')[0].split('/')[0].lower()
+    return token or '-'
+
+class PayloadStats:
+    """SQLite store of how often each payload worked, per server fingerprint.
+
+    order() sorts payloads by estimated hit rate for a fingerprint. The
+    estimate is the payload's hits and tries against that fingerprint,
+    smoothed towards its rate across all fingerprints (itself smoothed
+    towards 1/2), so a payload that worked elsewhere is tried early on an
+    unknown stack, and payloads with no history keep their corpus order,
+    ahead of ones that keep failing. A family's counters are loaded once
+    and updated in memory as attempts are recorded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS attempts (fingerprint TEXT, family TEXT, payload TEXT, "
+                         "tries INTEGER, hits INTEGER, PRIMARY KEY (fingerprint, family, payload))")
+        # family -> {payload: {fingerprint: [tries, hits]}}
+        self._families = {}
+
+    def order(self, fingerprint, family, payloads):
+        """payloads sorted by estimated hit rate against fingerprint, best first"""
+        with self._lock:
+            counts = self._family(family)
+            scores = {payload: self._score(counts.get(payload), fingerprint) for payload in payloads}
+        return sorted(payloads, key=lambda payload: -scores[payload])
+
+    def record(self, fingerprint, family, payload, hit):
+        """Count one attempt of payload against fingerprint"""
+        hit = 1 if hit else 0
+        with self._lock:
+            counts = self._family(family).setdefault(payload, {}).setdefault(fingerprint, [0, 0])
+            counts[0] += 1
+            counts[1] += hit
+            self._db.execute("INSERT INTO attempts VALUES (?, ?, ?, 1, ?) "
+                             "ON CONFLICT (fingerprint, family, payload) "
+                             "DO UPDATE SET tries = tries + 1, hits = hits + excluded.hits",
+                             (fingerprint, family, payload, hit))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _family(self, family):
+        counts = self._families.get(family)
+        if counts is None:
+            counts = self._families[family] = {}
+            rows = self._db.execute("SELECT payload, fingerprint, tries, hits FROM attempts WHERE family = ?", (family,))
+            for payload, fingerprint, tries, hits in rows:
+                counts.setdefault(payload, {})[fingerprint] = [tries, hits]
+        return counts
+
+    @staticmethod
+    def _score(counts, fingerprint):
+        if not counts:
+            return 0.5
+        tries = sum(entry[0] for entry in counts.values())
+        hits = sum(entry[1] for entry in counts.values())
+        prior = (hits + 1) / (tries + 2)
+        tries, hits = counts.get(fingerprint, (0, 0))
+        return (hits + prior) / (tries + 1)
+
+def set_stats(stats):
+    """Make stats the store scanners order payloads by and record into (None to stop)"""
+    global _stats
+    _stats = stats
+
+def get_stats():
+    return _stats
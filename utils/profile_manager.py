@@ -4,9 +4,9 @@ import os
 class ProfileManager:
     def __init__(self, profile_dir='profiles'):
         self.profile_dir = profile_dir
-        os.makedirs(self.profile_dir, exist_ok=True)
 
     def save_profile(self, profile_name, data):
+        os.makedirs(self.profile_dir, exist_ok=True)
         filepath = os.path.join(self.profile_dir, f"{profile_name}.json")
         with open(filepath, 'w') as f:
             json.dump(data, f, indent=4)
@@ -21,6 +21,8 @@ class ProfileManager:
             raise FileNotFoundError(f"Profile '{profile_name}' not found.")
 
     def list_profiles(self):
+        if not os.path.isdir(self.profile_dir):
+            return []
         return [f.replace('.json', '') for f in os.listdir(self.profile_dir) if f.endswith('.json')]
 
     def delete_profile(self, profile_name):
@@ -0,0 +1,105 @@
+"""
+Rate Limiter - Per-host token bucket with adaptive (AIMD) backoff
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+class HostRateLimiter:
+    """Schedules requests per target host rather than per scanner.
+
+    Each host gets a token bucket refilled at `rate` requests per second and
+    holding at most `burst` tokens. reserve() never blocks: it books the next
+    free slot for the host and returns how long the caller must wait, so the
+    same limiter serves blocking threads (time.sleep) and asyncio tasks
+    (asyncio.sleep) alike.
+
+    The rate adapts per host (AIMD): every healthy response raises it by a
+    small additive step back towards the configured rate, while 429/503
+    responses, connection errors and latency spikes cut it multiplicatively.
+    A latency spike is a time to first byte latency_factor times the host's
+    average and at least latency_floor seconds above it: against a fast
+    host, 2 ms after an average of 0.5 ms is jitter, not congestion.
+    """
+
+    def __init__(self, rate=2.0, burst=1, min_rate=0.1, decrease=0.5,
+                 latency_factor=3.0, latency_floor=0.05, latency_samples=5):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.min_rate = min(min_rate, self.rate)
+        self.increase = self.rate / 20
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.latency_floor = latency_floor
+        self.latency_samples = latency_samples
+
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._backoffs = 0
+
+    def reserve(self, url):
+        """Book a request slot for the URL's host and return the seconds to wait"""
+        now = time.monotonic()
+        with self._lock:
+            host = self._host(url, now)
+            host['tokens'] = min(self.burst, host['tokens'] + (now - host['updated']) * host['rate'])
+            host['updated'] = now
+            host['tokens'] -= 1
+
+            wait = max(0.0, host['blocked_until'] - now)
+            if host['tokens'] < 0:
+                wait = max(wait, -host['tokens'] / host['rate'])
+            return wait
+
+    def record(self, url, status_code, latency, retry_after=None):
+        """Feed a response (or a failed request, status_code=None) back into the AIMD loop;
+        latency is the time to the response headers"""
+        now = time.monotonic()
+        with self._lock:
+            host = self._host(url, now)
+
+            congested = status_code is None or status_code in (429, 503)
+            if host['samples'] >= self.latency_samples and self._spike(latency, host['latency']):
+                congested = True
+            elif status_code is not None:
+                # Slow moving average so a gradual slowdown still stands out
+                host['latency'] = latency if not host['samples'] else 0.8 * host['latency'] + 0.2 * latency
+                host['samples'] += 1
+
+            if congested:
+                host['rate'] = max(self.min_rate, host['rate'] * self.decrease)
+                self._backoffs += 1
+                if retry_after:
+                    try:
+                        host['blocked_until'] = max(host['blocked_until'], now + float(retry_after))
+                    except (TypeError, ValueError):
+                        pass  # HTTP-date form is not worth parsing here
+            else:
+                host['rate'] = min(self.rate, host['rate'] + self.increase)
+
+    def _spike(self, latency, average):
+        return latency > average * self.latency_factor and latency - average > self.latency_floor
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'backoffs': self._backoffs,
+                'host_rates': {name: round(host['rate'], 3) for name, host in self._hosts.items()}
+            }
+
+    def _host(self, url, now):
+        name = urlsplit(url).netloc.lower()
+        host = self._hosts.get(name)
+        if host is None:
+            host = self._hosts[name] = {
+                'rate': self.rate,
+                'tokens': float(self.burst),
+                'updated': now,
+                'blocked_until': 0.0,
+                'latency': 0.0,
+                'samples': 0
+            }
+        return host
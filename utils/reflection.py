@@ -0,0 +1,298 @@
+"""
+Reflection Context - Classifies where in a raw HTML response a reflection landed
+"""
+
+import re
+from bisect import bisect_left
+from collections import namedtuple
+
+from utils.js_taint import REGEX_LITERAL, starts_regex
+
+# kind: html, tag, attribute, url-attribute, event-handler, comment, rcdata,
+#       style, js-code, js-string, js-template, js-regex, js-comment
+# quote: the enclosing quote character (attribute, js-string), '/' for
+#        js-regex, '//' or '/*' for js-comment, '' otherwise
+# tag/attr: the element and attribute the reflection is in, where relevant
+# start: offset where the enclosing segment (text run, attribute value,
+#        string literal, ...) begins; equal starts mean the same segment
+Context = namedtuple('Context', 'kind quote tag attr start')
+
+URL_ATTRIBUTES = {'href', 'src', 'action', 'formaction', 'data', 'poster', 'background', 'xlink:href'}
+RCDATA_TAGS = {'textarea', 'title', 'xmp', 'noscript'}
+
+_tag_open = re.compile(r'<(?:!--|[a-zA-Z/!?])')
+_tag_name = re.compile(r'[^\s/>]+')
+# A whole start tag after its '<', by the same rules _tag_segments() follows
+_tag_span = re.compile(r'''[^\s/>]+(?:\s+|/|[^\s"'>/=]+(?:\s*=\s*(?:"[^"]*(?:"|\Z)|'[^']*(?:'|\Z)|[^\s>]*))?|["'=])*(?:>|\Z)''')
+_attr_name = re.compile(r'[^\s"\'>/=]+')
+_js_special = re.compile(r'["\'`/]')
+_template_special = re.compile(r'\\.|`|\$\{', re.DOTALL)
+_raw_text_close = {}
+# Any number of complete top-level constructs (text, comments, end tags and
+# declarations, start tags, raw-text element bodies) that _segments() would
+# step over. Tag attributes go through an atomic lookahead so that a quote
+# left open is not re-read as a stray character. Run with endpos set to an
+# offset, it skips ahead at C speed to the last boundary before it.
+_raw_text_names = r'(?:script|style|textarea|title|xmp|noscript)(?=[\s/>])'
+_tag_attrs = r'''(?:\s+|/|[^\s"'>/=]+(?:\s*=\s*(?:"[^"]*(?:"|\Z)|'[^']*(?:'|\Z)|[^\s>]*))?|["'=])*'''
+_skip = re.compile(rf'''(?:
+    [^<]+
+  | <!--[^-]*(?:-(?!->)[^-]*)*-->
+  | <(?:/|!(?!--)|\?)[^>]*>
+  | <(?=[^a-zA-Z/!?])
+  | <(?P<raw>{_raw_text_names})(?=(?P<raw_attrs>{_tag_attrs}))(?P=raw_attrs)>[^<]*(?:<(?!/(?P=raw))[^<]*)*(?=</(?P=raw))
+  | <(?!{_raw_text_names})[a-zA-Z][^\s/>]*(?=(?P<attrs>{_tag_attrs}))(?P=attrs)>
+)*''', re.IGNORECASE | re.DOTALL | re.VERBOSE)
+
+def classify(html, offsets):
+    """Return {offset: Context} for every offset, in one forward pass over html.
+
+    This is a lexer, not a parser: it tracks just enough HTML and JavaScript
+    state (tags, attribute quoting, comments, raw-text elements, string and
+    template literals) to tell which syntax an injected value would have to
+    break out of. Offsets past the end of html are not classified.
+
+    Only tags and scripts that contain one of the offsets are lexed in
+    detail: the markup up to the next offset is skipped by one compiled
+    regular expression, and the pass stops after the last offset.
+    """
+    pending = sorted(set(offsets))
+    results = {}
+    if not pending:
+        return results
+
+    index = 0
+    for start, end, context in _segments(html, pending):
+        while index < len(pending) and pending[index] < end:
+            if pending[index] >= start:
+                results[pending[index]] = context
+            index += 1
+        if index == len(pending):
+            break
+    return results
+
+def is_executable(html, context):
+    """Whether code at a position with this context runs without further breakout"""
+    if context.kind in ('js-code', 'event-handler'):
+        return True
+    if context.kind == 'url-attribute':
+        return html[context.start:context.start + 16].lstrip().lower().startswith('javascript:')
+    return False
+
+def _contains(pending, start, end):
+    index = bisect_left(pending, start)
+    return index < len(pending) and pending[index] < end
+
+def _segments(html, pending):
+    """Yield (start, end, Context) covering html from left to right.
+
+    Segments without a pending offset may be coarser than the contexts
+    inside them; their Context only has to be right about where they end.
+    """
+    position, length = 0, len(html)
+    while position < length:
+        index = bisect_left(pending, position)
+        if index < len(pending) and pending[index] > position:
+            skipped = _skip.match(html, position, pending[index]).end()
+            if skipped > position:
+                yield position, skipped, Context('html', '', None, None, position)
+                position = skipped
+                continue
+        match = _tag_open.search(html, position)
+        if match is None:
+            yield position, length, Context('html', '', None, None, position)
+            return
+        if match.start() > position:
+            yield position, match.start(), Context('html', '', None, None, position)
+        position = match.start()
+
+        if html.startswith('<!--', position):
+            end = html.find('-->', position + 4)
+            end = length if end == -1 else end + 3
+            yield position, end, Context('comment', '', None, None, position)
+            position = end
+            continue
+
+        if html[position + 1] in '/!?':
+            end = html.find('>', position)
+            end = length if end == -1 else end + 1
+            yield position, end, Context('tag', '', None, None, position)
+            position = end
+            continue
+
+        name_match = _tag_name.match(html, position + 1)
+        tag = name_match.group(0).lower()
+        span_end = _tag_span.match(html, position + 1).end()
+        if _contains(pending, position, span_end):
+            position = yield from _tag_segments(html, position, name_match.end(), tag)
+        else:
+            yield position, span_end, Context('tag', '', tag, None, position)
+            position = span_end
+
+        if tag in ('script', 'style') or tag in RCDATA_TAGS:
+            close = _raw_text_close.get(tag)
+            if close is None:
+                close = _raw_text_close[tag] = re.compile(r'</' + re.escape(tag), re.IGNORECASE)
+            close = close.search(html, position)
+            end = length if close is None else close.start()
+            if tag == 'script' and _contains(pending, position, end):
+                yield from _script_segments(html, position, end)
+            elif tag == 'script':
+                yield position, end, Context('js-code', '', tag, None, position)
+            else:
+                kind = 'style' if tag == 'style' else 'rcdata'
+                yield position, end, Context(kind, '', tag, None, position)
+            position = end
+
+def _tag_segments(html, tag_start, position, tag):
+    """Yield the segments of a start tag; returns the offset after its '>'"""
+    length = len(html)
+    segment_start = tag_start
+    while position < length:
+        char = html[position]
+        if char == '>':
+            yield segment_start, position + 1, Context('tag', '', tag, None, segment_start)
+            return position + 1
+        if char.isspace() or char == '/':
+            position += 1
+            continue
+
+        name_match = _attr_name.match(html, position)
+        if name_match is None:
+            position += 1
+            continue
+        attr = name_match.group(0).lower()
+        position = name_match.end()
+        while position < length and html[position].isspace():
+            position += 1
+        if position >= length or html[position] != '=':
+            continue
+
+        position += 1
+        while position < length and html[position].isspace():
+            position += 1
+        yield segment_start, position, Context('tag', '', tag, None, segment_start)
+
+        if attr.startswith('on'):
+            kind = 'event-handler'
+        elif attr in URL_ATTRIBUTES:
+            kind = 'url-attribute'
+        else:
+            kind = 'attribute'
+
+        if position < length and html[position] in '"\'':
+            quote = html[position]
+            end = html.find(quote, position + 1)
+            end = length if end == -1 else end
+            yield position + 1, end, Context(kind, quote, tag, attr, position + 1)
+            position = end + 1
+        else:
+            end = position
+            while end < length and not html[end].isspace() and html[end] != '>':
+                end += 1
+            yield position, end, Context(kind, '', tag, attr, position)
+            position = end
+        segment_start = position
+
+    yield segment_start, length, Context('tag', '', tag, None, segment_start)
+    return length
+
+def _script_segments(html, position, end):
+    """Yield the segments of a script body between position and end.
+
+    A / starts a regular expression literal or a division depending on the
+    token before it, by the same rules utils.js_taint tokenizes with.
+    """
+    code_start = position
+    # (kind, text) of the last token before code_start, (None, None) at the start
+    previous = (None, None)
+    while position < end:
+        match = _js_special.search(html, position, end)
+        if match is None:
+            break
+        token = match.group(0)
+        start = match.start()
+
+        if token == '/':
+            following = html[start + 1:start + 2]
+            if following not in ('/', '*'):
+                if starts_regex(*_last_token(html, code_start, start, previous)):
+                    regex = REGEX_LITERAL.match(html, start, end)
+                    if regex is not None:
+                        yield code_start, start, Context('js-code', '', 'script', None, code_start)
+                        yield start + 1, regex.end(), Context('js-regex', '/', 'script', None, start + 1)
+                        position = code_start = regex.end()
+                        previous = ('regex', regex.group())
+                        continue
+                position = start + 1
+                continue
+            closer = '\n' if following == '/' else '*/'
+            close = html.find(closer, start + 2, end)
+            close = end if close == -1 else close + len(closer)
+            previous = _last_token(html, code_start, start, previous)
+            yield code_start, start, Context('js-code', '', 'script', None, code_start)
+            yield start, close, Context('js-comment', '/' + following, 'script', None, start)
+            position = code_start = close
+            continue
+
+        yield code_start, start, Context('js-code', '', 'script', None, code_start)
+        if token == '`':
+            position = yield from _template_segments(html, start, end)
+            previous = ('template', '`')
+        else:
+            close = start + 1
+            while close < end and html[close] != token and html[close] != '\n':
+                close += 2 if html[close] == '\\' else 1
+            close = min(close, end)
+            yield start + 1, close, Context('js-string', token, 'script', None, start + 1)
+            position = close + 1
+            previous = ('string', token)
+        code_start = position
+
+    if code_start < end:
+        yield code_start, end, Context('js-code', '', 'script', None, code_start)
+
+def _last_token(html, code_start, position, previous):
+    # (kind, text) of the last token of the code between code_start and
+    # position, in the terms of js_taint.starts_regex; previous if there is none
+    index = position
+    while index > code_start and html[index - 1].isspace():
+        index -= 1
+    if index == code_start:
+        return previous
+    start = index
+    while start > code_start and (html[start - 1].isalnum() or html[start - 1] in '_$'):
+        start -= 1
+    if start < index:
+        word = html[start:index]
+        return ('number' if word[0].isdigit() else 'name'), word
+    return 'punct', html[index - 1]
+
+def _template_segments(html, position, end):
+    """Yield a template literal's segments; ${...} substitutions are code"""
+    literal_start = position + 1
+    position += 1
+    while position < end:
+        match = _template_special.search(html, position, end)
+        if match is None:
+            break
+        token = match.group(0)
+        if token[0] == '\\':
+            position = match.end()
+            continue
+        yield literal_start, match.start(), Context('js-template', '`', 'script', None, literal_start)
+        if token == '`':
+            return match.end()
+
+        depth, close = 1, match.end()
+        while close < end and depth:
+            if html[close] == '{':
+                depth += 1
+            elif html[close] == '}':
+                depth -= 1
+            close += 1
+        yield match.end(), close, Context('js-code', '', 'script', None, match.end())
+        position = literal_start = close
+
+    yield literal_start, end, Context('js-template', '`', 'script', None, literal_start)
+    return end
@@ -3,6 +3,7 @@ Report Generator - Generates formatted reports from scan results
 """
 
 import json
+import html as html_lib
 from datetime import datetime
 import os
 from rich.console import Console
@@ -10,6 +11,14 @@ from colorama import Fore, Style
 
 console = Console()
 
+# CSS modifier for each finding severity (see utils.findings)
+SEVERITY_CLASSES = {
+    'high': '',
+    'medium': ' warning',
+    'low': ' warning',
+    'info': ' info'
+}
+
 class ReportGenerator:
     def __init__(self):
         pass
@@ -297,6 +306,19 @@ class ReportGenerator:
                 
                 if isinstance(scan_results, list):
                     for issue in scan_results:
+                        # Structured findings carry their own severity
+                        if isinstance(issue, dict) and 'severity' in issue:
+                            html += f"""
+            <div class="vulnerability{SEVERITY_CLASSES.get(issue['severity'], ' info')}">
+                <p><strong>[{issue['severity'].upper()}]</strong> {html_lib.escape(issue['message'])}</p>
+"""
+                            if issue.get('evidence'):
+                                html += f"""                <pre>{html_lib.escape(issue['evidence'])}</pre>
+"""
+                            html += """            </div>
+"""
+                            continue
+                        
                         # Determine if it's an info message or a vulnerability
                         css_class = "vulnerability"
                         if "No" in issue or "not" in issue or "Note:" in issue:
@@ -414,7 +436,10 @@ class ReportGenerator:
                 
                 if isinstance(scan_results, list):
                     for issue in scan_results:
-                        text += f"- {issue}\n"
+                        if isinstance(issue, dict) and 'severity' in issue:
+                            text += f"- [{issue['severity'].upper()}] {issue['message']}\n"
+                        else:
+                            text += f"- {issue}\n"
                 elif isinstance(scan_results, dict):
                     if "vulnerable" in scan_results:
                         text += f"Vulnerable: {'Yes' if scan_results['vulnerable'] else 'No'}\n"
@@ -0,0 +1,130 @@
+"""
+Request Coalescer - Collapses identical in-flight and just-completed requests into one network call
+"""
+
+import threading
+from concurrent.futures import Future
+from urllib.parse import urlsplit, urlunsplit
+
+from requests.utils import requote_uri
+
+from utils.response_cache import ResponseCache, _freeze
+
+# Methods without side effects; only these are coalesced
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def normalize_url(url):
+    """url as the server receives it: quoted the way requests sends it,
+    without the fragment, with the query parameters sorted by name, and
+    with the scheme, host and default port spelled one way.
+
+    #<img src=x> and #<svg> payloads on the same page, or ?a=1&b=2 and
+    ?b=2&a=1, normalize to the same URL. Escapes are never decoded, so an
+    encoded probe (..%2F) is not the plain one (../); repeated parameters
+    keep their relative order (?id=1&id=2 is not ?id=2&id=1: many servers
+    use the last value), and a parameter without a value stays one (?a is
+    not ?a=).
+    """
+    parts = urlsplit(requote_uri(url))
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    try:
+        if parts.port is not None and parts.port == _DEFAULT_PORTS.get(scheme):
+            netloc = netloc.rsplit(':', 1)[0]
+    except ValueError:
+        pass
+    pairs = [pair for pair in parts.query.split('&') if pair]
+    query = '&'.join(sorted(pairs, key=lambda pair: pair.split('=', 1)[0]))
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+class RequestCoalescer:
+    """Lets identical requests share one network call.
+
+    Two requests are identical when their method and normalized URL match
+    and so do all their other options (parameters, body, headers, body
+    cap, early-stop signatures; the timeout aside). A request identical to
+    one still in flight waits for its response instead of being sent, and
+    one identical to a request completed less than window seconds ago gets
+    that response right away. Failures are shared with the requests
+    waiting on them but are not kept.
+
+    Only SAFE_METHODS are coalesced. Any other request to a host (a form
+    submission, say) invalidates what is in flight or kept for that host,
+    both when it is sent and when it completes, so a page fetched to see
+    whether a submission was stored is always fetched after it.
+    """
+
+    def __init__(self, window=10, maxsize=64):
+        self.window = window
+        self._completed = ResponseCache(maxsize, window) if window > 0 else None
+        self._in_flight = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.joined = 0
+        self.reused = 0
+
+    def key(self, method, url, options):
+        """Key of a request with the given options, or None if it must not be coalesced"""
+        method = method.upper()
+        if method not in SAFE_METHODS:
+            return None
+        key = (method, normalize_url(url), _freeze({name: value for name, value in options.items()
+                                                     if value is not None}))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def begin(self, key):
+        """(future, owner) for a request: the caller sends the request and
+        passes the outcome to finish() if owner is True, else it waits for
+        the future"""
+        host = urlsplit(key[1]).netloc
+        with self._lock:
+            generation = self._generations.get(host, 0)
+            if self._completed is not None:
+                entry = self._completed.get(key)
+                if entry is not None and entry[0] == generation:
+                    self.reused += 1
+                    future = Future()
+                    future.set_result(entry[1])
+                    return future, False
+            flight = self._in_flight.get(key)
+            if flight is not None and flight[1] == generation:
+                self.joined += 1
+                return flight[2], False
+            future = Future()
+            self._in_flight[key] = (host, generation, future)
+            return future, True
+
+    def finish(self, key, future, response=None, error=None):
+        """Hand the outcome of an owned request to the requests waiting on it"""
+        with self._lock:
+            flight = self._in_flight.get(key)
+            if flight is not None and flight[2] is future:
+                del self._in_flight[key]
+                host, generation, _ = flight
+                if error is None and self._completed is not None and generation == self._generations.get(host, 0):
+                    self._completed.put(key, (generation, response))
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(response)
+
+    def invalidate(self, method, url):
+        """Forget what is in flight or kept for url's host if method may change state there"""
+        if method.upper() in SAFE_METHODS:
+            return
+        host = urlsplit(normalize_url(url)).netloc
+        with self._lock:
+            self._generations[host] = self._generations.get(host, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'joined': self.joined,
+                'reused': self.reused
+            }
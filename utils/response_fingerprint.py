@@ -0,0 +1,118 @@
+"""
+Response Fingerprint - Content and similarity hashes to skip re-analysing the same probe response
+"""
+
+import copy
+import hashlib
+import re
+import threading
+
+# Status codes WAFs and filters answer blocked requests with
+BLOCK_STATUSES = {403, 406, 419, 429, 501}
+# Phrases from common WAF / filter block pages
+BLOCK_MARKERS = re.compile(
+    r'attention required! \| cloudflare|sorry, you have been blocked|request unsuccessful\. incapsula'
+    r'|the requested url was rejected|access denied|not acceptable!|mod_?security|web application firewall'
+    r'|sucuri website firewall|request blocked|has been blocked|forbidden by administrative rules',
+    re.IGNORECASE
+)
+# Similarity hashes this many bits apart or fewer are the same page
+SIMILAR_BITS = 3
+
+_token = re.compile(r'\w+')
+_digit = re.compile(r'\d')
+
+def content_hash(content):
+    """Digest identifying a body byte for byte"""
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+def simhash(text, limit=16384):
+    """64-bit similarity hash of the first limit characters of text.
+
+    Pages that differ only in small parts (the echoed URL, a sentence)
+    hash to values a few bits apart. Tokens with digits in them (request
+    ids, timestamps, ray ids) are all treated as the same token.
+    """
+    tokens = ['#' if _digit.search(token) else token for token in _token.findall(text[:limit].lower())]
+    weights = [0] * 64
+    for shingle in zip(tokens, tokens[1:]) if len(tokens) > 1 else [tokens]:
+        value = int.from_bytes(hashlib.blake2b(' '.join(shingle).encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+def similar(a, b, bits=SIMILAR_BITS):
+    return bin(a ^ b).count('1') <= bits
+
+class ResponseTracker:
+    """Remembers the probe responses of one target's scan.
+
+    check() tells a scanner whether a probe response needs analysing:
+
+    * 'blocked': a WAF / filter block page (by status code, or by a known
+      block phrase the baseline page does not contain). Block pages that
+      are near-identical (simhash) are counted together; once one of them
+      was returned block_limit times, exhausted is set and the remaining
+      payloads can be skipped.
+    * 'duplicate': byte-identical to the baseline or to a response already
+      analysed without a finding. A body that did not change with the
+      payload cannot contain it, so analysing it again cannot find more.
+    * 'analyze': anything else; report the outcome with record().
+
+    parameter() gives a tracker for one parameter's probes, which may run
+    concurrently with other parameters': block pages are counted per
+    parameter, while known responses and block pages are shared.
+    """
+
+    def __init__(self, baseline=None, block_limit=3):
+        self.block_limit = block_limit
+        self.exhausted = False
+        self._lock = threading.Lock()
+        self._negative = set()
+        self._baseline_marked = False
+        if baseline is not None:
+            self._negative.add(content_hash(baseline.content))
+            self._baseline_marked = _has_block_marker(baseline)
+        # simhash per distinct block page, and how often each was returned here
+        self._block_pages = []
+        self._block_counts = {}
+
+    def parameter(self):
+        tracker = copy.copy(self)
+        tracker.exhausted = False
+        tracker._block_counts = {}
+        return tracker
+
+    def check(self, response):
+        if self._is_block_page(response):
+            page_hash = simhash(response.content[:16384].decode('utf-8', errors='replace'))
+            with self._lock:
+                for index, known in enumerate(self._block_pages):
+                    if similar(known, page_hash):
+                        break
+                else:
+                    index = len(self._block_pages)
+                    self._block_pages.append(page_hash)
+            self._block_counts[index] = self._block_counts.get(index, 0) + 1
+            self.exhausted = self.exhausted or self._block_counts[index] >= self.block_limit
+            return 'blocked'
+        with self._lock:
+            if content_hash(response.content) in self._negative:
+                return 'duplicate'
+        return 'analyze'
+
+    def record(self, response, found):
+        if not found:
+            digest = content_hash(response.content)
+            with self._lock:
+                self._negative.add(digest)
+
+    def _is_block_page(self, response):
+        if response.status_code in BLOCK_STATUSES:
+            return True
+        return not self._baseline_marked and _has_block_marker(response)
+
+def _has_block_marker(response):
+    # Block pages are short: the start of the body is enough, and decoding
+    # only that keeps the check cheap on large responses
+    return BLOCK_MARKERS.search(response.content[:4096].decode('utf-8', errors='replace')) is not None
@@ -0,0 +1,221 @@
+"""
+Scan Engine - Drives scanner request flows on the blocking or the asyncio transport
+
+A scanner's logic is written once as a generator ("flow") that yields the
+network steps it needs and receives their results:
+
+    response = yield Request('GET', url)
+
+run_flow() executes those steps with blocking calls, run_flow_async() executes
+them on the event loop, so the same scanner code backs both scan() and
+scan_async(). Errors raised by a step are thrown back into the flow at the
+yield, so the scanner's own try/except blocks behave as with direct calls.
+
+A flow marks the start of each probe with
+
+    replayed = yield Unit(target, parameter, payload)
+
+which lets a resumed scan skip probes recorded in the scan journal: the
+step returns the findings the probe produced last time, or None when the
+probe still has to be run.
+
+Independent pieces of work (the forms of a page, the inputs of a form) are
+run concurrently with
+
+    results = yield Gather([self._test_form(form) for form in forms])
+
+which returns the sub-flows' results in the order the flows were given,
+however their requests interleave. At most as many sub-flows run at once
+as the HTTP client keeps connections per host; request pacing stays with
+the client's per-host rate limiter.
+
+CPU-heavy work (analysing a multi-megabyte script) is handed off with
+
+    flows = yield Compute(analyze, js)
+
+which runs the function in a shared pool of worker processes, so it
+neither holds the GIL against the other scans' threads nor blocks the
+event loop. The function must be importable by name and its arguments
+and result picklable.
+"""
+
+import asyncio
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Sub-flows run at once by a Gather step when the client has no pool size
+GATHER_WORKERS = 4
+# Worker processes for Compute steps (None: one per CPU)
+COMPUTE_WORKERS = None
+
+_worker = threading.local()
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+class Request:
+    """An HTTP request step; kwargs are passed through to the HTTP client"""
+
+    __slots__ = ('method', 'url', 'kwargs')
+
+    def __init__(self, method, url, **kwargs):
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+
+class Unit:
+    """Start of a resumable unit of work, keyed like the Findings it may produce"""
+
+    __slots__ = ('target', 'parameter', 'payload')
+
+    def __init__(self, target, parameter=None, payload=None):
+        self.target = target
+        self.parameter = parameter
+        self.payload = payload
+
+class Gather:
+    """Run sub-flows concurrently; the step's result is the list of their results, in order"""
+
+    __slots__ = ('flows',)
+
+    def __init__(self, flows):
+        self.flows = list(flows)
+
+class Compute:
+    """Run function(*args) in a worker process; the step's result is its return value"""
+
+    __slots__ = ('function', 'args')
+
+    def __init__(self, function, *args):
+        self.function = function
+        self.args = args
+
+def run_flow(flow, http, checkpoint=None):
+    """Run a scanner flow to completion using blocking I/O"""
+    value, error = None, None
+    while True:
+        try:
+            step = flow.throw(error) if error is not None else flow.send(value)
+        except StopIteration as stop:
+            if checkpoint:
+                checkpoint.finish(stop.value)
+            return stop.value
+
+        value, error = None, None
+        try:
+            if isinstance(step, Request):
+                value = http.request(step.method, step.url, **step.kwargs)
+            elif isinstance(step, Unit):
+                value = checkpoint.begin(step) if checkpoint else None
+            elif isinstance(step, Gather):
+                value = _gather(step.flows, http, checkpoint)
+            elif isinstance(step, Compute):
+                value = _compute(step)
+            else:
+                raise TypeError(f"Unknown scan step: {step!r}")
+        except Exception as e:
+            error = e
+            if checkpoint:
+                checkpoint.fail()
+
+async def run_flow_async(flow, http, checkpoint=None):
+    """Run a scanner flow to completion on the running event loop"""
+    value, error = None, None
+    while True:
+        try:
+            step = flow.throw(error) if error is not None else flow.send(value)
+        except StopIteration as stop:
+            if checkpoint:
+                checkpoint.finish(stop.value)
+            return stop.value
+
+        value, error = None, None
+        try:
+            if isinstance(step, Request):
+                value = await http.arequest(step.method, step.url, **step.kwargs)
+            elif isinstance(step, Unit):
+                value = checkpoint.begin(step) if checkpoint else None
+            elif isinstance(step, Gather):
+                value = await _gather_async(step.flows, http, checkpoint)
+            elif isinstance(step, Compute):
+                value = await _compute_async(step)
+            else:
+                raise TypeError(f"Unknown scan step: {step!r}")
+        except Exception as e:
+            error = e
+            if checkpoint:
+                checkpoint.fail()
+
+def _gather(flows, http, checkpoint):
+    # Each sub-flow journals its units on its own branch of the checkpoint.
+    # A Gather inside a gathered sub-flow runs its flows one after another,
+    # so nesting does not multiply the threads hitting one host.
+    branches = [checkpoint.branch() if checkpoint else None for _ in flows]
+    workers = min(len(flows), getattr(http, 'pool_maxsize', GATHER_WORKERS))
+    if workers <= 1 or getattr(_worker, 'active', False):
+        return [run_flow(flow, http, branch) for flow, branch in zip(flows, branches)]
+    with ThreadPoolExecutor(max_workers=workers, initializer=_mark_worker) as executor:
+        futures = [executor.submit(run_flow, flow, http, branch) for flow, branch in zip(flows, branches)]
+        return [future.result() for future in futures]
+
+def _mark_worker():
+    _worker.active = True
+
+async def _gather_async(flows, http, checkpoint):
+    semaphore = asyncio.Semaphore(max(1, getattr(http, 'pool_maxsize', GATHER_WORKERS)))
+
+    async def run(flow, branch):
+        async with semaphore:
+            return await run_flow_async(flow, http, branch)
+
+    return list(await asyncio.gather(*(run(flow, checkpoint.branch() if checkpoint else None) for flow in flows)))
+
+def _compute(step):
+    # A worker that died (killed, out of memory) breaks the whole pool: the
+    # step is retried once in a fresh pool, and later steps get a fresh one
+    for attempt in range(2):
+        pool = _compute_pool()
+        try:
+            return pool.submit(step.function, *step.args).result()
+        except BrokenProcessPool:
+            _discard_compute_pool(pool)
+            if attempt:
+                raise
+
+async def _compute_async(step):
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        pool = _compute_pool()
+        try:
+            return await loop.run_in_executor(pool, step.function, *step.args)
+        except BrokenProcessPool:
+            _discard_compute_pool(pool)
+            if attempt:
+                raise
+
+def _compute_pool():
+    # Started on first use; spawned rather than forked, since forking a
+    # process that runs threads can deadlock the child
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=COMPUTE_WORKERS,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        return _process_pool
+
+def _discard_compute_pool(pool):
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+@atexit.register
+def _shutdown_compute_pool():
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
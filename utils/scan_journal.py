@@ -0,0 +1,144 @@
+"""
+Scan Journal - SQLite checkpoint log of completed scan work for resumable scans
+"""
+
+import json
+import sqlite3
+import threading
+
+from utils.findings import Finding, fingerprint
+
+_journal = None
+
+class ScanJournal:
+    """Records finished work so an interrupted scan can pick up where it stopped.
+
+    Two granularities are kept:
+
+    * units: one probe of a scanner, identified like a Finding by
+      (scanner, target, parameter, payload), with the findings it produced
+    * scans: a scanner that ran to completion against a target, with its
+      full results
+
+    On resume a completed scan is returned as-is and, inside a scan that was
+    cut short, completed units are replayed instead of re-sending their
+    payloads. Work during which a request failed is never marked complete.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS units (unit TEXT PRIMARY KEY)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS findings (unit TEXT, data TEXT, PRIMARY KEY (unit, data))")
+        self._db.execute("CREATE TABLE IF NOT EXISTS scans (target TEXT, scanner TEXT, results TEXT, "
+                         "PRIMARY KEY (target, scanner))")
+        if not resume:
+            for table in ('units', 'findings', 'scans'):
+                self._db.execute(f"DELETE FROM {table}")
+        self.replayed_units = 0
+        self.replayed_scans = 0
+
+    def checkpoint(self, target, scanner):
+        return Checkpoint(self, target, scanner)
+
+    def record_finding(self, finding):
+        with self._lock:
+            self._db.execute("INSERT OR IGNORE INTO findings VALUES (?, ?)",
+                             (finding.fingerprint, json.dumps(finding.to_dict())))
+
+    def unit_findings(self, unit):
+        """Findings of a completed unit ([] if it found nothing), or None if not completed"""
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM units WHERE unit = ?", (unit,)).fetchone() is None:
+                return None
+            rows = self._db.execute("SELECT data FROM findings WHERE unit = ?", (unit,)).fetchall()
+            self.replayed_units += 1
+        return [Finding.from_dict(json.loads(data)) for (data,) in rows]
+
+    def complete_unit(self, unit):
+        with self._lock:
+            self._db.execute("INSERT OR IGNORE INTO units VALUES (?)", (unit,))
+
+    def scan_results(self, target, scanner):
+        with self._lock:
+            row = self._db.execute("SELECT results FROM scans WHERE target = ? AND scanner = ?",
+                                   (target, scanner)).fetchone()
+            if row is None:
+                return None
+            self.replayed_scans += 1
+        return [Finding.from_dict(item) if isinstance(item, dict) and 'severity' in item else item
+                for item in json.loads(row[0])]
+
+    def complete_scan(self, target, scanner, results):
+        data = json.dumps([item.to_dict() if isinstance(item, Finding) else item for item in results])
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO scans VALUES (?, ?, ?)", (target, scanner, data))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class Checkpoint:
+    """Journal view of one scanner run against one target, driven by the scan engine.
+
+    Sub-flows run concurrently by a Gather step each get a branch(): it
+    tracks its own current unit, and a failure in it keeps the whole scan
+    from being marked complete.
+    """
+
+    def __init__(self, journal, target, scanner, parent=None):
+        self.journal = journal
+        self.target = target
+        self.scanner = scanner
+        self.parent = parent
+        self.failed = False
+        self._unit = None
+        self._unit_failed = False
+
+    def branch(self):
+        return Checkpoint(self.journal, self.target, self.scanner, parent=self)
+
+    def results(self):
+        return self.journal.scan_results(self.target, self.scanner)
+
+    def begin(self, step):
+        """Start the unit described by a scan_engine.Unit step.
+
+        The previous unit is complete once the flow moves on to the next one.
+        Returns the replayed findings if this unit already completed, else None.
+        """
+        self._commit()
+        unit = fingerprint(self.scanner, step.target, step.parameter, step.payload)
+        replayed = self.journal.unit_findings(unit)
+        if replayed is None:
+            self._unit, self._unit_failed = unit, False
+        return replayed
+
+    def fail(self):
+        self.failed = True
+        self._unit_failed = True
+        checkpoint = self.parent
+        while checkpoint is not None:
+            checkpoint.failed = True
+            checkpoint = checkpoint.parent
+
+    def finish(self, results):
+        self._commit()
+        if self.parent is None and not self.failed and isinstance(results, list):
+            self.journal.complete_scan(self.target, self.scanner, results)
+
+    def _commit(self):
+        if self._unit is not None and not self._unit_failed:
+            self.journal.complete_unit(self._unit)
+        self._unit = None
+
+def set_journal(journal):
+    """Make journal the one scanners checkpoint into (None to stop)"""
+    global _journal
+    _journal = journal
+
+def get_journal():
+    return _journal
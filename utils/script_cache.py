@@ -0,0 +1,160 @@
+"""
+Script Cache - On-disk cache of external scripts and their analysis, shared across targets and runs
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+_cache = None
+
+_max_age = re.compile(r'max-age\s*=\s*(\d+)', re.IGNORECASE)
+
+# digest: content hash of the body last served for the URL
+# etag, last_modified: validators to revalidate it with
+# expires: until when it may be used without asking the server (epoch seconds)
+CachedScript = namedtuple('CachedScript', 'url digest etag last_modified expires')
+
+class ScriptCache:
+    """SQLite store of downloaded scripts, keyed by URL and deduplicated by content.
+
+    A URL maps to the content hash of the body it last served. Bodies are
+    stored once per hash, so the same jQuery build served from a thousand
+    hosts takes one row, and analysis results (e.g. the sinks found in a
+    script) are stored per hash and per kind of analysis: a bundle analysed
+    once is never analysed again, whichever URL it came from.
+
+    A cached URL is used as-is while the max-age it was served with lasts;
+    after that it is revalidated with If-None-Match / If-Modified-Since and
+    a 304 keeps the stored body. A URL is revalidated at most once per run.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS scripts (url TEXT PRIMARY KEY, digest TEXT, "
+                         "etag TEXT, last_modified TEXT, expires REAL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS bodies (digest TEXT PRIMARY KEY, content BLOB)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS analyses (digest TEXT, kind TEXT, result TEXT, "
+                         "PRIMARY KEY (digest, kind))")
+        self._checked = set()
+        self.hits = 0
+        self.revalidated = 0
+        self.downloads = 0
+        self.analyses_reused = 0
+
+    def lookup(self, url):
+        """The CachedScript for url, or None if it was never stored"""
+        with self._lock:
+            row = self._db.execute("SELECT url, digest, etag, last_modified, expires FROM scripts WHERE url = ?",
+                                   (url,)).fetchone()
+        return CachedScript(*row) if row else None
+
+    def usable(self, entry):
+        """Whether entry can be used without asking the server"""
+        if entry is None:
+            return False
+        with self._lock:
+            usable = entry.url in self._checked or entry.expires > time.time()
+            if usable:
+                self.hits += 1
+        return usable
+
+    @staticmethod
+    def validators(entry):
+        """Conditional request headers revalidating entry ({} if there is nothing to revalidate)"""
+        headers = {}
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, url, response, entry=None):
+        """Record the response to a (conditional) request for url; returns the body's digest.
+
+        Returns None when there is nothing worth caching (an error status or
+        a body cut short), in which case the response is used as it is.
+        """
+        expires = time.time() + _freshness(response.headers)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self._db.execute("UPDATE scripts SET etag = ?, last_modified = ?, expires = ? WHERE url = ?",
+                                 (etag or entry.etag, last_modified or entry.last_modified, expires, url))
+                self._checked.add(url)
+                self.revalidated += 1
+            return entry.digest
+        if response.status_code != 200 or getattr(response, 'truncated', False):
+            return None
+
+        digest = content_digest(response.content)
+        with self._lock:
+            self._db.execute("INSERT OR IGNORE INTO bodies VALUES (?, ?)", (digest, response.content))
+            self._db.execute("INSERT OR REPLACE INTO scripts VALUES (?, ?, ?, ?, ?)",
+                             (url, digest, etag, last_modified, expires))
+            self._checked.add(url)
+            self.downloads += 1
+        return digest
+
+    def content(self, digest):
+        """Stored body with the given digest (None if unknown)"""
+        with self._lock:
+            row = self._db.execute("SELECT content FROM bodies WHERE digest = ?", (digest,)).fetchone()
+        return row[0] if row else None
+
+    def result(self, digest, kind):
+        """Stored result of the kind of analysis for a body, or None"""
+        with self._lock:
+            row = self._db.execute("SELECT result FROM analyses WHERE digest = ? AND kind = ?",
+                                   (digest, kind)).fetchone()
+            if row is None:
+                return None
+            self.analyses_reused += 1
+        return json.loads(row[0])
+
+    def save_result(self, digest, kind, result):
+        """Store a JSON-serializable analysis result for a body"""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO analyses VALUES (?, ?, ?)", (digest, kind, json.dumps(result)))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'downloads': self.downloads,
+                'analyses_reused': self.analyses_reused
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def content_digest(content):
+    """Key a script body is stored and analysed under"""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+def _freshness(headers):
+    # Seconds a response may be used without revalidation, from Cache-Control
+    cache_control = headers.get('Cache-Control', '')
+    if 'no-cache' in cache_control.lower() or 'no-store' in cache_control.lower():
+        return 0
+    match = _max_age.search(cache_control)
+    return int(match.group(1)) if match else 0
+
+def set_script_cache(cache):
+    """Make cache the store the DOM scanner keeps external scripts in (None to stop)"""
+    global _cache
+    _cache = cache
+
+def get_script_cache():
+    return _cache